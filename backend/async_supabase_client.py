@@ -0,0 +1,244 @@
+import os
+import httpx
+from supabase_client import SUPABASE_URL, SUPABASE_SERVICE_KEY
+from utils.resilience import AsyncResilientTransport, default_timeout, supabase_breaker, supabase_retries
+
+# Shared connection pool settings for the async PostgREST client
+HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "20"))
+
+
+class PostgrestError(Exception):
+    def __init__(self, status_code: int, payload):
+        self.status_code = status_code
+        self.payload = payload
+        if isinstance(payload, dict):
+            self.code = payload.get("code")
+            message = payload.get("message") or str(payload)
+        else:
+            self.code = None
+            message = str(payload)
+        super().__init__(message)
+
+
+class APIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _quote(value):
+    value = str(value)
+    if any(ch in value for ch in ',.:()" '):
+        value = '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return value
+
+
+class AsyncQuery:
+    """
+    Async counterpart of the supabase-py query builder. Supports the subset of
+    the fluent API the routes use, e.g.:
+
+        await async_supabase.schema("analytics").table("x").select("*").eq("user_id", uid).execute()
+    """
+
+    def __init__(self, client: "AsyncSupabase", schema: str, table: str):
+        self._client = client
+        self._schema = schema
+        self._table = table
+        self._method = "GET"
+        self._params = []
+        self._order = []
+        self._headers = {}
+        self._prefer = []
+        self._json = None
+        self._timeout = None
+
+    # --- verbs ---
+    def select(self, *columns, count: str = None, head: bool = False):
+        self._params.append(("select", ",".join(c.replace(" ", "") for c in columns) or "*"))
+        if count:
+            self._prefer.append(f"count={count}")
+        if head:
+            self._method = "HEAD"
+        return self
+
+    def insert(self, rows, returning: str = "representation"):
+        self._method = "POST"
+        self._json = rows
+        self._prefer.append(f"return={returning}")
+        return self
+
+    def upsert(self, rows, on_conflict: str = None, returning: str = "representation"):
+        self.insert(rows, returning)
+        self._prefer.append("resolution=merge-duplicates")
+        if on_conflict:
+            self._params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, values: dict, returning: str = "representation"):
+        self._method = "PATCH"
+        self._json = values
+        self._prefer.append(f"return={returning}")
+        return self
+
+    def delete(self, returning: str = "representation"):
+        self._method = "DELETE"
+        self._prefer.append(f"return={returning}")
+        return self
+
+    # --- filters ---
+    def _filter(self, column: str, op: str, value):
+        self._params.append((column, f"{op}.{value}"))
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, "lte", value)
+
+    def is_(self, column: str, value):
+        return self._filter(column, "is", "null" if value is None else value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, "in", "(" + ",".join(_quote(v) for v in values) + ")")
+
+    def or_(self, filters: str):
+        self._params.append(("or", f"({filters})"))
+        return self
+
+    # --- modifiers ---
+    def order(self, column: str, desc: bool = False):
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, count: int):
+        self._params.append(("limit", str(count)))
+        return self
+
+    def range(self, start: int, end: int):
+        self._params.append(("offset", str(start)))
+        self._params.append(("limit", str(end - start + 1)))
+        return self
+
+    def single(self):
+        self._headers["Accept"] = "application/vnd.pgrst.object+json"
+        return self
+
+    def timeout(self, seconds: float):
+        """Override the client's SUPABASE_HTTP_TIMEOUT for this call."""
+        self._timeout = seconds
+        return self
+
+    async def execute(self) -> APIResponse:
+        params = list(self._params)
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+
+        headers = dict(self._headers)
+        profile_header = "Accept-Profile" if self._method in ("GET", "HEAD") else "Content-Profile"
+        headers[profile_header] = self._schema
+        if self._prefer:
+            headers["Prefer"] = ",".join(self._prefer)
+
+        http = self._client.http()
+        response = await http.request(
+            self._method,
+            f"/rest/v1/{self._table}",
+            params=params,
+            headers=headers,
+            json=self._json,
+            timeout=self._timeout if self._timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+
+        if response.status_code >= 400:
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = response.text
+            raise PostgrestError(response.status_code, payload)
+
+        count = None
+        content_range = response.headers.get("content-range")
+        if content_range and "/" in content_range:
+            total = content_range.split("/")[-1]
+            count = int(total) if total.isdigit() else None
+
+        data = None
+        if self._method != "HEAD" and response.content:
+            data = response.json()
+
+        return APIResponse(data, count)
+
+
+class AsyncSchema:
+    def __init__(self, client: "AsyncSupabase", schema: str):
+        self._client = client
+        self._schema = schema
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self._client, self._schema, name)
+
+    from_ = table
+
+
+class AsyncSupabase:
+    """
+    Async PostgREST access over one shared httpx.AsyncClient per worker.
+    The pool is sized by SUPABASE_HTTP_MAX_CONNECTIONS / SUPABASE_HTTP_MAX_KEEPALIVE;
+    timeouts, read retries and the circuit breaker come from utils/resilience.py.
+    """
+
+    def __init__(self, url: str, key: str):
+        self.url = url.rstrip("/")
+        self.key = key
+        self._http = None
+
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.url,
+                headers={
+                    "apikey": self.key,
+                    "Authorization": f"Bearer {self.key}"
+                },
+                transport=AsyncResilientTransport(
+                    supabase_breaker,
+                    supabase_retries,
+                    httpx.AsyncHTTPTransport(limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE
+                    ))
+                ),
+                timeout=default_timeout()
+            )
+        return self._http
+
+    def schema(self, name: str) -> AsyncSchema:
+        return AsyncSchema(self, name)
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self, "public", name)
+
+    from_ = table
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+async_supabase = AsyncSupabase(SUPABASE_URL, SUPABASE_SERVICE_KEY)
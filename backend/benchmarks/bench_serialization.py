@@ -0,0 +1,108 @@
+"""
+Before/after serialization benchmark for the leads routes.
+
+Builds /leads and /lead-analytics payloads from the fake Supabase seed data
+and times the old path (jsonable_encoder + stdlib json, as FastAPI's default
+JSONResponse does) against utils.json_response.dumps, then the compressed
+size and cost of each encoding CompressionMiddleware can negotiate.
+
+    cd backend
+    python benchmarks/bench_serialization.py --sizes 1000,10000 --output serialization.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import fake_supabase  # noqa: E402
+from utils import compression  # noqa: E402
+from utils.json_response import USE_ORJSON, dumps  # noqa: E402
+
+
+def stdlib_render(payload):
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def build_payloads(size: int):
+    fake_supabase.seed(users=1, campaigns_per_user=3, leads_per_user=size)
+    leads = list(fake_supabase.store.table("leads").scan(["user-0000"]))
+    return {
+        "leads_all": {
+            "pending_leads": [l for l in leads if l["status"] == "pending"],
+            "approved_leads": [l for l in leads if l["status"] == "approved"]
+        },
+        "lead_analytics_all": {
+            "lead_list": fake_supabase.view_lead_analytics(["user-0000"])
+        }
+    }
+
+
+def time_ms(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and compression of lead payloads")
+    parser.add_argument("--sizes", default="1000,10000", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    print(f"json backend: {'orjson' if USE_ORJSON else 'stdlib'}, brotli: {compression.brotli is not None}")
+    results = []
+    for size in args.sizes:
+        for name, payload in build_payloads(size).items():
+            before_ms, body = time_ms(lambda: stdlib_render(payload), args.repeat)
+            after_ms, fast_body = time_ms(lambda: dumps(payload), args.repeat)
+            assert json.loads(body) == json.loads(fast_body)
+
+            result = {
+                "payload": name,
+                "rows": size,
+                "bytes": len(fast_body),
+                "stdlib_ms": before_ms,
+                "fast_ms": after_ms,
+                "speedup": round(before_ms / after_ms, 2) if after_ms else None
+            }
+            encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+            for encoding in encodings:
+                ms, compressed = time_ms(
+                    lambda: compression.compress(fast_body, encoding, args.gzip_level, args.brotli_quality),
+                    max(1, args.repeat // 4)
+                )
+                result[f"{encoding}_bytes"] = len(compressed)
+                result[f"{encoding}_ms"] = ms
+            results.append(result)
+
+            print(
+                f"{name:<20} {size:>7} rows  {result['bytes']:>10} B  "
+                f"stdlib {before_ms:>8} ms  fast {after_ms:>8} ms  x{result['speedup']}  "
+                f"gzip {result['gzip_bytes']:>9} B / {result['gzip_ms']} ms"
+                + (f"  br {result['br_bytes']:>9} B / {result['br_ms']} ms" if "br_bytes" in result else "")
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+In-memory stand-in for the Supabase PostgREST and auth APIs, used by the
+benchmark harness. Implements the subset of PostgREST the backend uses
+(select/insert/upsert/update/delete, eq/neq/lt/lte/gt/gte/in/is/or filters,
+order/limit/offset, exact counts, single-object responses) plus computed
+versions of the analytics views, with a configurable injected latency.
+
+Run standalone:
+
+    python benchmarks/fake_supabase.py --port 54321 --latency-ms 20
+
+Seed it with POST /_bench/seed {"users": 10, "campaigns_per_user": 3, "leads_per_user": 1000}.
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "or", "and", "on_conflict", "columns"}
+EMAIL_EVENT_TYPES = ("sent", "opened", "clicked")
+
+
+# --- storage ---
+
+class Table:
+    """Rows by id plus a per-user index so user-scoped queries stay cheap."""
+
+    def __init__(self):
+        self.rows = {}
+        self.by_user = {}
+
+    def insert(self, row: dict):
+        row.setdefault("id", str(uuid.uuid4()))
+        self.rows[row["id"]] = row
+        if "user_id" in row:
+            self.by_user.setdefault(row["user_id"], {})[row["id"]] = row
+        return row
+
+    def delete(self, row: dict):
+        self.rows.pop(row["id"], None)
+        if "user_id" in row:
+            self.by_user.get(row["user_id"], {}).pop(row["id"], None)
+
+    def scan(self, user_ids=None):
+        if user_ids is None:
+            return list(self.rows.values())
+        rows = []
+        for user_id in user_ids:
+            rows.extend(self.by_user.get(user_id, {}).values())
+        return rows
+
+
+class Store:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name: str) -> Table:
+        return self.tables.setdefault(name, Table())
+
+    def reset(self):
+        self.tables = {}
+
+
+store = Store()
+
+
+# --- analytics views, computed from the base tables ---
+
+def _user_ids(user_ids):
+    return user_ids if user_ids is not None else list(store.table("profiles").rows)
+
+
+def view_lead_analytics(user_ids):
+    campaigns = store.table("campaigns").rows
+    return [
+        {
+            "lead_id": lead["id"],
+            "user_id": lead["user_id"],
+            "campaign_id": lead["campaign_id"],
+            "campaign_name": campaigns.get(lead["campaign_id"], {}).get("name"),
+            "name": lead.get("name"),
+            "email": lead.get("email"),
+            "company": lead.get("company"),
+            "position": lead.get("position"),
+            "status": lead.get("status"),
+            "quality_score": lead.get("quality_score"),
+            "created_at": lead.get("created_at")
+        }
+        for lead in store.table("leads").scan(user_ids)
+    ]
+
+
+def _campaign_counts(user_id):
+    counts = {}
+    for campaign in store.table("campaigns").scan([user_id]):
+        counts[campaign["id"]] = {
+            "user_id": user_id,
+            "campaign_id": campaign["id"],
+            "campaign_name": campaign.get("name"),
+            "total_leads": 0,
+            "pending_leads": 0,
+            "approved_leads": 0,
+            **{f"emails_{t}": 0 for t in EMAIL_EVENT_TYPES}
+        }
+    for lead in store.table("leads").scan([user_id]):
+        row = counts.get(lead.get("campaign_id"))
+        if row is None:
+            continue
+        row["total_leads"] += 1
+        if lead.get("status") in ("pending", "approved"):
+            row[f"{lead['status']}_leads"] += 1
+    for event in store.table("email_events").scan([user_id]):
+        row = counts.get(event.get("campaign_id"))
+        key = f"emails_{event.get('event_type')}"
+        if row is not None and key in row:
+            row[key] += 1
+    return list(counts.values())
+
+
+def _totals(user_id):
+    totals = {"user_id": user_id, "campaigns": 0}
+    for row in _campaign_counts(user_id):
+        totals["campaigns"] += 1
+        for key, value in row.items():
+            if isinstance(value, int):
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def view_campaigns_kpis(user_ids):
+    return [row for user_id in _user_ids(user_ids) for row in _campaign_counts(user_id)]
+
+
+def view_totals(user_ids):
+    return [_totals(user_id) for user_id in _user_ids(user_ids)]
+
+
+def view_activity_logs(user_ids):
+    return store.table("activity_logs").scan(user_ids)
+
+
+VIEWS = {
+    ("analytics", "lead_analytics"): view_lead_analytics,
+    ("analytics", "campaigns_kpis"): view_campaigns_kpis,
+    ("analytics", "campaigns_kpi_all"): view_totals,
+    ("analytics", "dashboard_kpi_cards"): view_totals,
+    ("analytics", "dashboard_kpis_all"): view_campaigns_kpis,
+    ("analytics", "activity_logs_view"): view_activity_logs,
+}
+
+
+# --- PostgREST filter parsing ---
+
+def _split_top_level(text: str):
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _unquote(value: str):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _coerce(a, b):
+    if isinstance(a, bool):
+        return str(a).lower(), b
+    if isinstance(a, (int, float)):
+        try:
+            return a, float(b)
+        except (TypeError, ValueError):
+            return str(a), b
+    return ("" if a is None else str(a)), b
+
+
+def parse_condition(column: str, expression: str):
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+
+    if op == "in":
+        values = {_unquote(v) for v in _split_top_level(raw.strip()[1:-1])}
+        test = lambda row: row.get(column) is not None and str(row.get(column)) in values
+    elif op == "is":
+        target = None if raw == "null" else raw == "true"
+        test = lambda row: row.get(column) is target
+    else:
+        value = _unquote(raw)
+        compare = {
+            "eq": lambda a, b: a == b,
+            "neq": lambda a, b: a != b,
+            "lt": lambda a, b: a < b,
+            "lte": lambda a, b: a <= b,
+            "gt": lambda a, b: a > b,
+            "gte": lambda a, b: a >= b,
+        }[op]
+
+        def test(row):
+            if row.get(column) is None:
+                return False
+            a, b = _coerce(row[column], value)
+            return compare(a, b)
+
+    return (lambda row: not test(row)) if negate else test
+
+
+def parse_logic(kind: str, body: str):
+    tests = []
+    for part in _split_top_level(body):
+        part = part.strip()
+        if part.startswith("and(") or part.startswith("or("):
+            inner_kind, _, rest = part.partition("(")
+            tests.append(parse_logic(inner_kind, rest[:-1]))
+        else:
+            column, _, expression = part.partition(".")
+            tests.append(parse_condition(column, expression))
+    if kind == "and":
+        return lambda row: all(t(row) for t in tests)
+    return lambda row: any(t(row) for t in tests)
+
+
+def parse_query(request: Request):
+    tests, user_ids = [], None
+    for key, value in request.query_params.multi_items():
+        if key in ("or", "and"):
+            tests.append(parse_logic(key, value[1:-1]))
+        elif key not in RESERVED_PARAMS:
+            tests.append(parse_condition(key, value))
+            if key == "user_id" and value.startswith("eq."):
+                user_ids = [_unquote(value[3:])]
+            elif key == "user_id" and value.startswith("in."):
+                user_ids = [_unquote(v) for v in _split_top_level(value[4:-1])]
+    return tests, user_ids
+
+
+def apply_modifiers(rows, request: Request):
+    order = request.query_params.get("order")
+    if order:
+        for term in reversed(order.split(",")):
+            column, _, direction = term.partition(".")
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=direction.startswith("desc"))
+            rows = present + missing
+
+    offset = int(request.query_params.get("offset", 0))
+    limit = request.query_params.get("limit")
+    if limit is not None:
+        return rows[offset:offset + int(limit)]
+    return rows[offset:]
+
+
+def project(rows, select: str):
+    if not select or select == "*" or "*" in select.split(","):
+        return [dict(r) for r in rows]
+    columns = [c.split(":")[-1] for c in select.split(",") if "(" not in c]
+    return [{c: r.get(c) for c in columns} for r in rows]
+
+
+# --- handlers ---
+
+LATENCY = {"base_ms": 0.0, "jitter_ms": 0.0}
+
+
+async def inject_latency():
+    delay = LATENCY["base_ms"] + random.uniform(0, LATENCY["jitter_ms"])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+def _prefer(request: Request):
+    return {p.strip() for p in request.headers.get("prefer", "").split(",") if p.strip()}
+
+
+def _respond(request: Request, rows, total=None, status=200):
+    prefer = _prefer(request)
+    headers = {}
+    if "count=exact" in prefer:
+        end = max(len(rows) - 1, 0)
+        headers["content-range"] = f"0-{end}/{total if total is not None else len(rows)}"
+    if request.method in ("POST", "PATCH", "DELETE") and "return=representation" not in prefer:
+        return Response(status_code=204 if status == 200 else status, headers=headers)
+    if request.method == "HEAD":
+        return Response(status_code=200, headers=headers)
+    if "vnd.pgrst.object" in request.headers.get("accept", ""):
+        if len(rows) != 1:
+            return JSONResponse(
+                {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned"},
+                status_code=406
+            )
+        return JSONResponse(rows[0], status_code=status, headers=headers)
+    return JSONResponse(rows, status_code=status, headers=headers)
+
+
+async def rest_handler(request: Request):
+    await inject_latency()
+    name = request.path_params["table"]
+    schema = request.headers.get("accept-profile") or request.headers.get("content-profile") or "public"
+    tests, user_ids = parse_query(request)
+
+    if request.method in ("GET", "HEAD"):
+        view = VIEWS.get((schema, name))
+        rows = view(user_ids) if view else store.table(name).scan(user_ids)
+        rows = [r for r in rows if all(t(r) for t in tests)]
+        total = len(rows)
+        rows = apply_modifiers(rows, request)
+        return _respond(request, project(rows, request.query_params.get("select")), total)
+
+    table = store.table(name)
+
+    if request.method == "POST":
+        payload = json.loads(await request.body() or b"null")
+        payload = payload if isinstance(payload, list) else [payload]
+        merge = "resolution=merge-duplicates" in _prefer(request)
+        written = []
+        for row in payload:
+            existing = table.rows.get(row.get("id"))
+            if existing is not None and merge:
+                existing.update(row)
+                written.append(existing)
+            elif existing is not None:
+                return JSONResponse({"code": "23505", "message": "duplicate key value violates unique constraint"}, status_code=409)
+            else:
+                written.append(table.insert(dict(row)))
+        return _respond(request, [dict(r) for r in written], status=201)
+
+    rows = [r for r in table.scan(user_ids) if all(t(r) for t in tests)]
+
+    if request.method == "PATCH":
+        values = json.loads(await request.body() or b"{}")
+        for row in rows:
+            row.update(values)
+        return _respond(request, [dict(r) for r in rows])
+
+    if request.method == "DELETE":
+        for row in rows:
+            table.delete(row)
+        return _respond(request, [dict(r) for r in rows])
+
+    return JSONResponse({"message": "method not allowed"}, status_code=405)
+
+
+def _auth_user(user_id: str):
+    return {
+        "id": user_id,
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": f"{user_id}@bench.local",
+        "app_metadata": {},
+        "user_metadata": {},
+        "created_at": "2024-01-01T00:00:00Z"
+    }
+
+
+async def auth_user_handler(request: Request):
+    await inject_latency()
+    # Tokens issued by this fake are the user id itself
+    token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    if token not in store.table("profiles").rows:
+        return JSONResponse({"message": "invalid token"}, status_code=401)
+    return JSONResponse(_auth_user(token))
+
+
+async def auth_token_handler(request: Request):
+    await inject_latency()
+    payload = await request.json()
+    user_id = payload.get("email", "").split("@")[0]
+    if user_id not in store.table("profiles").rows:
+        return JSONResponse({"error": "invalid_grant", "error_description": "Invalid login credentials"}, status_code=400)
+    return JSONResponse({
+        "access_token": user_id,
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "expires_at": 4102444800,
+        "refresh_token": user_id,
+        "user": _auth_user(user_id)
+    })
+
+
+# --- benchmark control ---
+
+def seed(users: int, campaigns_per_user: int, leads_per_user: int, events_per_lead: float = 0.5):
+    store.reset()
+    rng = random.Random(42)
+    base_time = datetime(2024, 1, 1)
+
+    for u in range(users):
+        user_id = f"user-{u:04d}"
+        store.table("profiles").insert({
+            "id": user_id,
+            "first_name": f"Bench{u}",
+            "last_name": "User",
+            "company_name": "Bench Co",
+            "is_approved": True
+        })
+        campaign_ids = []
+        for c in range(campaigns_per_user):
+            campaign_id = f"{user_id}-c{c:03d}"
+            campaign_ids.append(campaign_id)
+            store.table("campaigns").insert({
+                "id": campaign_id,
+                "user_id": user_id,
+                "name": f"Campaign {c}",
+                "job_titles": ["CTO", "Head of Sales", "Marketing Manager"],
+                "status": "active",
+                "created_at": (base_time + timedelta(days=c)).isoformat()
+            })
+        for n in range(leads_per_user):
+            lead_id = f"{user_id}-l{n:07d}"
+            campaign_id = campaign_ids[n % len(campaign_ids)] if campaign_ids else None
+            status = "approved" if rng.random() < 0.3 else "pending"
+            store.table("leads").insert({
+                "id": lead_id,
+                "campaign_id": campaign_id,
+                "user_id": user_id,
+                "name": f"Lead {n}",
+                "email": f"lead{n}@company{n % 97}.example",
+                "company": f"Company {n % 97}",
+                "phone": "+10000000000" if rng.random() < 0.6 else None,
+                "status": status,
+                "quality_score": None,
+                "last_contacted": None,
+                "created_at": (base_time + timedelta(seconds=n)).isoformat(),
+                "category": "Software",
+                "position": rng.choice(["CTO", "Engineer", "Head of Sales", "Analyst"]),
+                "email_status": rng.choice(["valid", "catch-all", "invalid", None]),
+                "website": f"https://company{n % 97}.example",
+                "domain": f"company{n % 97}.example",
+                "location": "Berlin",
+                "address": None,
+                "promotion_status": None
+            })
+            if status == "approved" and rng.random() < events_per_lead:
+                store.table("email_events").insert({
+                    "user_id": user_id,
+                    "campaign_id": campaign_id,
+                    "lead_id": lead_id,
+                    "event_type": rng.choice(EMAIL_EVENT_TYPES),
+                    "created_at": (base_time + timedelta(seconds=n, minutes=5)).isoformat()
+                })
+        for a in range(20):
+            store.table("activity_logs").insert({
+                "user_id": user_id,
+                "campaign_id": campaign_ids[0] if campaign_ids else None,
+                "action": "Leads scraped",
+                "metadata": {"leads_count": leads_per_user},
+                "created_at": (base_time + timedelta(hours=a)).isoformat()
+            })
+
+
+async def seed_handler(request: Request):
+    payload = await request.json()
+    seed(
+        users=payload.get("users", 10),
+        campaigns_per_user=payload.get("campaigns_per_user", 3),
+        leads_per_user=payload.get("leads_per_user", 1000)
+    )
+    return JSONResponse({"tables": {name: len(t.rows) for name, t in store.tables.items()}})
+
+
+async def latency_handler(request: Request):
+    payload = await request.json()
+    LATENCY["base_ms"] = float(payload.get("latency_ms", LATENCY["base_ms"]))
+    LATENCY["jitter_ms"] = float(payload.get("jitter_ms", LATENCY["jitter_ms"]))
+    return JSONResponse(LATENCY)
+
+
+async def health_handler(request: Request):
+    return JSONResponse({"status": "ok"})
+
+
+app = Starlette(routes=[
+    Route("/rest/v1/{table}", rest_handler, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+    Route("/auth/v1/user", auth_user_handler, methods=["GET"]),
+    Route("/auth/v1/token", auth_token_handler, methods=["POST"]),
+    Route("/_bench/seed", seed_handler, methods=["POST"]),
+    Route("/_bench/latency", latency_handler, methods=["POST"]),
+    Route("/_bench/health", health_handler, methods=["GET"]),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Supabase server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    LATENCY["base_ms"] = args.latency_ms
+    LATENCY["jitter_ms"] = args.jitter_ms
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
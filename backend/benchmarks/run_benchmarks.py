@@ -0,0 +1,286 @@
+"""
+Endpoint benchmark harness.
+
+Starts benchmarks/fake_supabase.py and the FastAPI app from main.py (via
+uvicorn, pointed at the fake) as subprocesses, seeds synthetic data at each
+requested size and drives every router with concurrent requests. Throughput
+and p50/p95/p99 latency per scenario are printed and written as JSON.
+
+    cd backend
+    python benchmarks/run_benchmarks.py --sizes 100,1000,10000 --latency-ms 20 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SERVER = os.path.join(BACKEND_DIR, "benchmarks", "fake_supabase.py")
+
+# Shaped like a JWT so supabase-py accepts it as an API key
+FAKE_SERVICE_KEY = "bench.service.key"
+
+
+def user_id(n: int):
+    return f"user-{n:04d}"
+
+
+def lead_id(user: int, n: int):
+    return f"{user_id(user)}-l{n:07d}"
+
+
+def scraped_lead(n: int):
+    return {
+        "Employee_Name": f"Scraped {n}",
+        "Work_Email": f"scraped{n}@bench.example",
+        "Company": f"Company {n % 97}",
+        "Work_Mobile_No": "+10000000000",
+        "Position": "CTO",
+        "Email_Status": "valid",
+        "Website": f"https://company{n % 97}.example",
+        "Domain": f"company{n % 97}.example"
+    }
+
+
+def build_scenarios(users: int, leads_per_user: int, scrape_batch: int, approve_batch: int, delete_batch: int):
+    """
+    Each scenario maps a request index to (method, path, json_body). Write
+    scenarios walk through the seeded lead ids so requests touch distinct rows.
+    """
+    def campaign(i):
+        return f"{user_id(i % users)}-c000"
+
+    def approve(i):
+        u = i % users
+        start = (i // users) * approve_batch
+        return "POST", "/leads-approved", {
+            "user_id": user_id(u),
+            "campaign_id": campaign(i),
+            "type": "sent",
+            "leads": [
+                {"lead_id": lead_id(u, (start + k) % leads_per_user), "approved": True}
+                for k in range(approve_batch)
+            ]
+        }
+
+    def delete(i):
+        u = i % users
+        # Delete from the newest end so approvals above keep their rows
+        start = leads_per_user - (i // users + 1) * delete_batch
+        return "DELETE", "/delete-leads", {
+            "lead_ids": [lead_id(u, start + k) for k in range(delete_batch) if start + k >= 0]
+        }
+
+    return [
+        ("dashboard", lambda i: ("GET", f"/dashboard/dashboard/{user_id(i % users)}", None)),
+        ("campaign_kpis", lambda i: ("GET", f"/campaign-kpis/{user_id(i % users)}", None)),
+        ("lead_analytics", lambda i: ("GET", f"/lead-analytics/{user_id(i % users)}", None)),
+        ("lead_analytics_all", lambda i: ("GET", f"/lead-analytics/{user_id(i % users)}?all=true", None)),
+        ("leads", lambda i: ("GET", f"/leads/{user_id(i % users)}", None)),
+        ("leads_all", lambda i: ("GET", f"/leads/{user_id(i % users)}?all=true", None)),
+        ("lead_scraping", lambda i: ("POST", "/lead-scraping", {
+            "campaign_id": campaign(i),
+            "user_id": user_id(i % users),
+            "leads": [scraped_lead(i * scrape_batch + k) for k in range(scrape_batch)]
+        })),
+        ("leads_approved", approve),
+        ("export_approved", lambda i: ("GET", f"/export_approved/{user_id(i % users)}", None)),
+        ("delete_leads", delete),
+    ]
+
+
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, make_request, requests: int, concurrency: int):
+    latencies = []
+    statuses = {}
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, body = make_request(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == "error" or status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(requests / duration, 2) if duration else None,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2)
+    }
+
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited before {url} became ready")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def start_servers(args):
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    fake = subprocess.Popen([
+        sys.executable, FAKE_SERVER,
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms)
+    ], cwd=BACKEND_DIR)
+
+    env = dict(
+        os.environ,
+        SUPABASE_URL=fake_url,
+        SUPABASE_SERVICE_KEY=FAKE_SERVICE_KEY
+    )
+    if args.disable_cache:
+        env["RESPONSE_CACHE_TTL"] = "0"
+    env.update(dict(kv.split("=", 1) for kv in args.app_env))
+
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1",
+        "--port", str(args.app_port),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "--no-access-log"
+    ], cwd=BACKEND_DIR, env=env)
+
+    try:
+        wait_for(f"{fake_url}/_bench/health", fake)
+        wait_for(f"{app_url}/health", app)
+    except Exception:
+        stop_servers(fake, app)
+        raise
+    return fake, app, fake_url, app_url
+
+
+def stop_servers(*processes):
+    # Stop in order so the app can flush buffered writes to the fake on shutdown
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run(args):
+    fake, app, fake_url, app_url = start_servers(args)
+    results = []
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.timeout) as client:
+            for size in args.sizes:
+                seeded = httpx.post(f"{fake_url}/_bench/seed", json={
+                    "users": args.users,
+                    "campaigns_per_user": args.campaigns,
+                    "leads_per_user": size
+                }, timeout=300).json()
+                print(f"\n== {args.users} users x {size} leads ({seeded['tables']}) ==")
+
+                scenarios = build_scenarios(
+                    args.users, size, args.scrape_batch, args.approve_batch, args.delete_batch
+                )
+                for name, make_request in scenarios:
+                    if args.only and name not in args.only:
+                        continue
+                    result = await run_scenario(client, name, make_request, args.requests, args.concurrency)
+                    result["leads_per_user"] = size
+                    results.append(result)
+                    print(
+                        f"{name:<20} {result['throughput_rps']:>9} req/s  "
+                        f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                        f"p99 {result['p99_ms']:>8} ms  errors {result['errors']}"
+                    )
+    finally:
+        stop_servers(app, fake)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark backend endpoints against a fake Supabase")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        type=lambda s: [int(x) for x in s.split(",")], help="Leads per user, comma separated")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--campaigns", type=int, default=3, help="Campaigns per user")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--scrape-batch", type=int, default=100, help="Leads per /lead-scraping request")
+    parser.add_argument("--approve-batch", type=int, default=20, help="Leads per /leads-approved request")
+    parser.add_argument("--delete-batch", type=int, default=10, help="Leads per /delete-leads request")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--disable-cache", action="store_true", help="Set RESPONSE_CACHE_TTL=0 for the app")
+    parser.add_argument("--only", type=lambda s: set(s.split(",")), default=None, help="Scenario names to run")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the app process (repeatable)")
+    parser.add_argument("--fake-port", type=int, default=54321)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--output", default="bench_results.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: sorted(v) if isinstance(v, set) else v for k, v in vars(args).items()},
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
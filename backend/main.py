@@ -1,6 +1,19 @@
-from fastapi import FastAPI, Request
+import time
+
+# Measured from the first line so the startup gauges include route imports
+STARTED_AT = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+import asyncio
 import os
+import threading
+
+from async_supabase_client import async_supabase
+from supabase_client import get_supabase
+from routes.activity_log import activity_log_writer
 
 from routes.auth import router as auth_router
 from routes.dashboard import router as dashboard_router
@@ -12,20 +25,71 @@ from routes.leads_approved import router as leads_approved_router
 from routes.profile import router as profile_router
 from services.export_leads import router as export_router
 from routes.delete_leads import router as delete_leads_router
+from routes.jobs import router as jobs_router
+from routes.bootstrap import router as bootstrap_router
+from routes.lead_scoring import router as lead_scoring_router
+from routes.events import router as events_router
+from services.events import close_streams_on_exit_signal, event_broker
+from services.jobs import job_runner
+from services.sent_email import close_sender
+from utils.response_cache import response_cache
+from utils.auth_helpers import approval_cache
+from utils.metrics import MetricsMiddleware, metrics
+from utils.json_response import FastJSONResponse
+from utils.compression import CompressionMiddleware
+from utils.resilience import CircuitOpenError, render_prometheus, resilience_stats
+
+# Response compression for JSON/text bodies of at least COMPRESSION_MIN_SIZE bytes (0 disables)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# "production" runs without the reloader; "development" reloads on change.
+# Keep WEB_CONCURRENCY at 1: jobs, event streams, dedup reservations, KPI
+# counters and caches live in each worker's memory, so with more workers a
+# job polled on another worker 404s and SSE clients miss other workers'
+# events. Raise it only once jobs and events live in a shared store.
+APP_ENV = os.getenv("APP_ENV", "production").lower()
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Upper bound on how long shutdown waits for open connections before cancelling them
+GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "10"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the shared clients once per worker. The sync client is built in the
+    # background so the worker starts serving straight away; a request that
+    # needs it first waits on the same lock instead of building a second one
+    async_supabase.http()
+    threading.Thread(target=get_supabase, name="supabase-warmup", daemon=True).start()
+    activity_log_writer.start()
+    close_streams_on_exit_signal(asyncio.get_running_loop())
+
+    ready = time.perf_counter() - STARTED_AT
+    metrics.set_gauge("app_startup_seconds", ready)
+    print(f"Worker {os.getpid()} ready in {ready:.3f}s (imports {IMPORT_SECONDS:.3f}s)")
+    yield
+    # End open event streams, flush buffered activity logs, then close the shared async PostgREST connection pool
+    event_broker.close()
+    job_runner.shutdown()
+    close_sender()
+    activity_log_writer.stop()
+    await async_supabase.aclose()
+
 
-app = FastAPI()
+# orjson-backed JSON responses by default (JSON_BACKEND=stdlib falls back to json)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
-# Middleware to log POST request bodies and 422 errors
-@app.middleware("http")
-async def log_post_bodies(request: Request, call_next):
-    if request.method == "POST":
-        body = await request.body()
-        print(f"\n>>> POST {request.url.path}")
-        print(f">>> BODY: {body.decode('utf-8')}")
-    response = await call_next(request)
-    if response.status_code == 422:
-        print(f">>> 422 on {request.url.path} - check body above")
-    return response
+if COMPRESSION_MIN_SIZE > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY
+    )
+
+# Per-route latency, size and status metrics (body logging is opt-in, see utils/metrics.py)
+app.add_middleware(MetricsMiddleware)
 
 # CORS middleware - allow all origins (suitable for Render deployment)
 app.add_middleware(
@@ -34,6 +98,7 @@ app.add_middleware(
     allow_credentials=False,   # Must be False when using "*"
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],   # Let the frontend send If-None-Match on polls
 )
 
 # Include all routers
@@ -47,15 +112,68 @@ app.include_router(leads_approved_router)
 app.include_router(profile_router)
 app.include_router(export_router)
 app.include_router(delete_leads_router)
+app.include_router(lead_scoring_router)
+app.include_router(jobs_router)
+app.include_router(bootstrap_router)
+app.include_router(events_router)
+
+IMPORT_SECONDS = time.perf_counter() - STARTED_AT
+metrics.set_gauge("app_import_seconds", IMPORT_SECONDS)
+
+# Fail fast with 503 while the Supabase circuit breaker is open
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request, exc: CircuitOpenError):
+    return FastJSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": f"{exc.retry_after:.0f}"}
+    )
+
 
-# Health check endpoint
+# Health check endpoint; stays 200 while an upstream is down so the instance is not recycled
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    upstreams = resilience_stats()
+    degraded = any(s["state"] != "closed" for s in upstreams.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "upstreams": {name: s["state"] for name, s in upstreams.items()}
+    }
+
+
+# Prometheus-style request metrics, plus upstream breaker and retry counters
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render_prometheus() + render_prometheus()
+
+
+# In-process cache and event stream counters
+@app.get("/cache-stats")
+def cache_stats():
+    return {
+        "responses": response_cache.stats(),
+        "approvals": approval_cache.stats(),
+        "event_streams": event_broker.stats()
+    }
 
 
 # Run Uvicorn with Render-compatible port
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))  # Use Render's PORT or default 8000
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
\ No newline at end of file
+    if APP_ENV == "development":
+        uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True,
+                    timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT)
+    else:
+        # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            workers=WEB_CONCURRENCY,
+            loop="auto",
+            http="auto",
+            proxy_headers=True,
+            forwarded_allow_ips="*",
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT
+        )
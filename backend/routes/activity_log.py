@@ -1,7 +1,177 @@
 from supabase_client import supabase
+from utils.metrics import metrics
+from utils.resilience import CircuitOpenError, upstream_error_status
+from utils.response_cache import invalidate_user
+from collections import deque
 from datetime import datetime
+import logging
+import os
+import queue
+import threading
+import time
 import uuid
 
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "100"))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL", "1.0"))
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+# A batch that failed because Supabase was unreachable is retried with
+# exponential backoff (capped at ACTIVITY_LOG_MAX_BACKOFF seconds), up to
+# ACTIVITY_LOG_MAX_RETRIES times, while at most ACTIVITY_LOG_QUEUE_SIZE rows
+# are waiting for a retry
+ACTIVITY_LOG_MAX_RETRIES = int(os.getenv("ACTIVITY_LOG_MAX_RETRIES", "8"))
+ACTIVITY_LOG_MAX_BACKOFF = float(os.getenv("ACTIVITY_LOG_MAX_BACKOFF", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+def _write_activity_logs(entries: list):
+    supabase.schema("public") \
+        .table("activity_logs") \
+        .insert(entries) \
+        .execute()
+
+
+class ActivityLogWriter:
+    """
+    Write-behind buffer for activity_logs. Entries are queued in memory and
+    written as multi-row inserts once `batch_size` entries are waiting or
+    `flush_interval` seconds have passed.
+
+    When Supabase is unreachable (connection error, timeout, open breaker)
+    the batch is kept and retried with backoff. When Supabase rejects the
+    insert, the batch is split in halves until the offending rows are
+    isolated, so other users' rows still land. Rows that cannot be written
+    are dropped, logged and counted in activity_log_dropped_rows_total.
+    stop() drains the queue.
+    """
+
+    def __init__(self, batch_size: int = ACTIVITY_LOG_BATCH_SIZE,
+                 flush_interval: float = ACTIVITY_LOG_FLUSH_INTERVAL,
+                 max_queue: int = ACTIVITY_LOG_QUEUE_SIZE,
+                 max_retries: int = ACTIVITY_LOG_MAX_RETRIES,
+                 max_backoff: float = ACTIVITY_LOG_MAX_BACKOFF):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._retry = deque()
+        self._retry_rows = 0
+        self.dropped_rows = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def enqueue(self, entry: dict):
+        """Queue an entry; returns False when the writer is stopped or the queue is full."""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            return False
+
+    def _take_batch(self, timeout: float):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drop(self, batch: list, attempts: int, error: Exception):
+        self.dropped_rows += len(batch)
+        metrics.inc_counter("activity_log_dropped_rows_total", len(batch))
+        logger.error("Dropped %d activity log rows after %d failed writes: %s", len(batch), attempts, error)
+
+    def _backoff(self, attempts: int, error: Exception):
+        delay = min(self.flush_interval * (2 ** attempts), self.max_backoff)
+        if isinstance(error, CircuitOpenError):
+            # No point trying before the breaker lets a trial call through
+            delay = max(delay, error.retry_after)
+        return delay
+
+    def _flush(self, batch: list, attempts: int = 0, final: bool = False):
+        try:
+            _write_activity_logs(batch)
+        except Exception as e:
+            if upstream_error_status(e) is None:
+                # Supabase rejected the rows themselves; retrying them unchanged won't help
+                if len(batch) > 1:
+                    middle = len(batch) // 2
+                    self._flush(batch[:middle], attempts, final)
+                    self._flush(batch[middle:], attempts, final)
+                else:
+                    self._drop(batch, attempts + 1, e)
+                return
+
+            attempts += 1
+            if final or attempts > self.max_retries or self._retry_rows + len(batch) > self.max_queue:
+                self._drop(batch, attempts, e)
+            else:
+                delay = self._backoff(attempts, e)
+                logger.warning("Failed to write %d activity log rows (attempt %d), retrying in %.1fs: %s",
+                               len(batch), attempts, delay, e)
+                self._retry.append((batch, attempts, time.monotonic() + delay))
+                self._retry_rows += len(batch)
+            return
+        # Dashboard reads include the activity log view
+        for user_id in {entry["user_id"] for entry in batch}:
+            invalidate_user(user_id)
+
+    def _flush_retries(self, final: bool = False):
+        now = time.monotonic()
+        for _ in range(len(self._retry)):
+            batch, attempts, not_before = self._retry.popleft()
+            if not final and not_before > now:
+                self._retry.append((batch, attempts, not_before))
+                continue
+            self._retry_rows -= len(batch)
+            self._flush(batch, attempts, final)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch(self.flush_interval)
+            self._flush_retries()
+            if batch:
+                self._flush(batch)
+
+        # Drain whatever is left on shutdown, with one last try for failed batches
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                break
+            self._flush(batch, final=True)
+        self._flush_retries(final=True)
+
+
+activity_log_writer = ActivityLogWriter()
+
 
 def insert_activity_log(user_id: str, campaign_id: str, action: str, metadata: dict):
     activity_id = str(uuid.uuid4())
@@ -15,9 +185,8 @@ def insert_activity_log(user_id: str, campaign_id: str, action: str, metadata: d
         "created_at": datetime.utcnow().isoformat()
     }
 
-    supabase.schema("public") \
-        .table("activity_logs") \
-        .insert(activity_data) \
-        .execute()
+    # Fall back to a direct write when the writer is not running or is saturated
+    if not activity_log_writer.enqueue(activity_data):
+        _write_activity_logs([activity_data])
 
     return activity_data
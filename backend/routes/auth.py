@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, EmailStr
 from supabase_client import supabase
+from utils.auth_helpers import invalidate_approval
+from utils.resilience import upstream_error_status
 import os
 
 
@@ -122,6 +124,7 @@ def approve_user(user_id: str):
                 .update({"is_approved": True})\
                 .eq("id", user_id)\
                 .execute()
+            invalidate_approval(user_id)
             print(f"User {user_id} approved successfully")  # Debug log
 
         # Fetch email from auth.users
@@ -276,10 +279,14 @@ def login(data: LoginRequest):
             "password": data.password
         })
     except Exception as e:
-        msg = str(e)
-        if 'timed out' in msg.lower() or 'timeout' in msg.lower() or 'read' in msg.lower():
+        status = upstream_error_status(e)
+        if status == 504:
             raise HTTPException(status_code=504, detail="Upstream auth request timed out")
-        raise HTTPException(status_code=400, detail=msg)
+        if status == 503:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"})
+        if status:
+            raise HTTPException(status_code=status, detail=f"Upstream auth request failed: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not login_response or getattr(login_response, 'user', None) is None:
         raise HTTPException(status_code=400, detail="Invalid credentials")
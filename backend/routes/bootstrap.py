@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import os
+from routes.profile import profile
+from routes.dashboard import load_dashboard
+from routes.campaign_kpi import load_campaign_kpis
+from routes.leads_analytics import load_lead_list, get_user_leads
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.resilience import CircuitOpenError
+
+router = APIRouter()
+
+BOOTSTRAP_SECTION_TIMEOUT = float(os.getenv("BOOTSTRAP_SECTION_TIMEOUT", "5"))
+
+
+async def _section(name: str, coro, timeout: float):
+    """Run one section, turning a timeout or failure into an error marker."""
+    try:
+        return name, await asyncio.wait_for(coro, timeout), None
+    except asyncio.TimeoutError:
+        return name, None, {"status": 504, "detail": f"Timed out after {timeout}s"}
+    except HTTPException as e:
+        return name, None, {"status": e.status_code, "detail": e.detail}
+    except CircuitOpenError as e:
+        return name, None, {"status": 503, "detail": str(e), "retry_after": round(e.retry_after)}
+    except Exception as e:
+        return name, None, {"status": 500, "detail": str(e)}
+
+
+@router.get("/bootstrap/{user_id}")
+async def bootstrap(
+    user_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size for lead sections"),
+    timeout: float = Query(BOOTSTRAP_SECTION_TIMEOUT, gt=0, le=30, description="Per-section timeout in seconds")
+):
+    """
+    Everything the frontend needs for its first render in one round trip:
+    profile, dashboard, campaign KPIs and the first page of lead analytics
+    and leads. Sections run concurrently; a section that fails or times out
+    is null and reported under `errors` instead of failing the response.
+    """
+    sections = await asyncio.gather(
+        _section("profile", profile(user_id), timeout),
+        _section("dashboard", load_dashboard(user_id), timeout),
+        _section("campaign_kpis", load_campaign_kpis(user_id), timeout),
+        _section("lead_analytics", load_lead_list(user_id, cursor=None, limit=limit, fetch_all=False), timeout),
+        _section("leads", get_user_leads(
+            user_id, status=None, counts_only=False, cursor=None, limit=limit, fetch_all=False
+        ), timeout)
+    )
+
+    response = {"user_id": user_id}
+    errors = {}
+    for name, data, error in sections:
+        response[name] = data
+        if error:
+            errors[name] = error
+    response["errors"] = errors
+    return response
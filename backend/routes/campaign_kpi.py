@@ -1,22 +1,28 @@
-from fastapi import APIRouter, HTTPException
-from supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Literal
+from async_supabase_client import async_supabase
+from utils.response_cache import get_cached, set_cached
+from services.kpi_aggregator import get_kpi_counters
+from routes.dashboard import UserBatchRequest, get_view_rows_for_users, order_view_rows
+from utils.etag import conditional_json
+from utils.resilience import CircuitOpenError
 import asyncio
 
 router = APIRouter()
 
 
-def get_campaign_kpis_sync(user_id: str):
-    result = supabase.schema("analytics") \
+async def get_campaign_kpis_rows(user_id: str):
+    query = async_supabase.schema("analytics") \
         .table("campaigns_kpis") \
         .select("*") \
-        .eq("user_id", user_id) \
-        .execute()
+        .eq("user_id", user_id)
+    result = await order_view_rows(query, "campaigns_kpis").execute()
 
     return result.data
 
 
-def get_campaign_kpis_all_sync(user_id: str):
-    result = supabase.schema("analytics") \
+async def get_campaign_kpis_all_rows(user_id: str):
+    result = await async_supabase.schema("analytics") \
         .table("campaigns_kpi_all") \
         .select("*") \
         .eq("user_id", user_id) \
@@ -25,18 +31,83 @@ def get_campaign_kpis_all_sync(user_id: str):
     return result.data
 
 
+async def load_campaign_kpis(user_id: str):
+    cached = get_cached("campaign_kpis", user_id)
+    if cached is not None:
+        return cached
+
+    kpis_result, kpis_all_result = await asyncio.gather(
+        get_campaign_kpis_rows(user_id),
+        get_campaign_kpis_all_rows(user_id)
+    )
+
+    response = {
+        "campaign_kpis": kpis_result,
+        "campaign_kpis_all": kpis_all_result
+    }
+    set_cached("campaign_kpis", user_id, response)
+    return response
+
+
 @router.get("/campaign-kpis/{user_id}")
-async def get_campaign_kpis(user_id: str):
+async def get_campaign_kpis(request: Request, user_id: str, source: Literal["views", "counters"] = Query("views")):
+    if source == "counters":
+        try:
+            counters = await get_kpi_counters(user_id)
+            return {
+                "campaign_counters": [
+                    {"campaign_id": campaign_id, **campaign}
+                    for campaign_id, campaign in counters["campaigns"].items()
+                ],
+                "age_seconds": counters["age_seconds"]
+            }
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        kpis_task = asyncio.to_thread(get_campaign_kpis_sync, user_id)
-        kpis_all_task = asyncio.to_thread(get_campaign_kpis_all_sync, user_id)
+        return await conditional_json(request, "campaign_kpis", user_id, lambda: load_campaign_kpis(user_id))
 
-        kpis_result, kpis_all_result = await asyncio.gather(kpis_task, kpis_all_task)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/campaign-kpis/batch")
+async def get_campaign_kpis_batch(payload: UserBatchRequest):
+    """
+    Campaign KPIs for several users, keyed by user_id, each shaped like
+    GET /campaign-kpis/{user_id}.
+    """
+    user_ids = list(dict.fromkeys(payload.user_ids))
+    results = {}
+    missing = []
+    for user_id in user_ids:
+        cached = get_cached("campaign_kpis", user_id)
+        if cached is not None:
+            results[user_id] = cached
+        else:
+            missing.append(user_id)
+
+    try:
+        if missing:
+            kpis_result, kpis_all_result = await asyncio.gather(
+                get_view_rows_for_users("campaigns_kpis", missing),
+                get_view_rows_for_users("campaigns_kpi_all", missing)
+            )
+            for user_id in missing:
+                response = {
+                    "campaign_kpis": kpis_result[user_id],
+                    "campaign_kpis_all": kpis_all_result[user_id]
+                }
+                set_cached("campaign_kpis", user_id, response)
+                results[user_id] = response
 
-        return {
-            "campaign_kpis": kpis_result,
-            "campaign_kpis_all": kpis_all_result
-        }
+        return {"users": {user_id: results[user_id] for user_id in user_ids}}
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
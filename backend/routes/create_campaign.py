@@ -3,6 +3,9 @@ from pydantic import BaseModel, HttpUrl
 from typing import List
 from supabase_client import supabase
 from routes.activity_log import insert_activity_log
+from utils.response_cache import invalidate_user
+from services.kpi_aggregator import kpi_aggregator
+from services.events import publish_change
 from datetime import datetime
 
 router = APIRouter()
@@ -52,6 +55,7 @@ def create_campaign(user_id: str, payload: CampaignWithEmailCreate):
 
         inserted_campaign = campaign_result.data[0]
         campaign_id = inserted_campaign["id"]
+        kpi_aggregator.campaign_created(user_id, campaign_id)
 
         # 3️⃣ Prepare email content data
         email_data = payload.email.model_dump(mode='json')
@@ -74,6 +78,14 @@ def create_campaign(user_id: str, payload: CampaignWithEmailCreate):
             action="Started lead scraping",
             metadata=campaign_data
         )
+        invalidate_user(user_id)
+        publish_change(
+            user_id,
+            "campaign_created",
+            delta={"campaigns": 1},
+            campaign_id=campaign_id,
+            name=inserted_campaign.get("name")
+        )
 
         # 6️⃣ Return response
         return {
@@ -1,23 +1,59 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from typing import List, Literal
 import asyncio
-from supabase_client import supabase
+from async_supabase_client import async_supabase
+from utils.response_cache import get_cached, set_cached
+from services.kpi_aggregator import get_kpi_counters
+from utils.etag import conditional_json
+from utils.bulk_insert import chunked
+from utils.pagination import SCAN_PAGE_SIZE
+from utils.resilience import CircuitOpenError
 
 router = APIRouter()
 
+MAX_BATCH_USERS = 100
+# Users per `in_` query when a batch reads a view; each query is then paged
+BATCH_QUERY_USERS = 20
+DASHBOARD_VIEWS = {
+    "dashboard_kpis": "dashboard_kpi_cards",
+    "dashboard_kpis_all": "dashboard_kpis_all",
+    "activity_logs": "activity_logs_view"
+}
+# Row order within one user's rows of each view, ending on a unique column so
+# paged batch reads neither repeat nor skip rows. Views missing here have one
+# row per user.
+VIEW_ORDER = {
+    "dashboard_kpi_cards": [("campaign_id", False)],
+    "activity_logs_view": [("created_at", True), ("id", True)],
+    "campaigns_kpis": [("campaign_id", False)]
+}
 
-def get_dashboard_kpis_sync(user_id: str):
-    result = supabase.schema("analytics") \
+
+def order_view_rows(query, view: str):
+    """Apply the view's VIEW_ORDER, so single-user and batch reads list rows alike."""
+    for column, desc in VIEW_ORDER.get(view, []):
+        query = query.order(column, desc=desc)
+    return query
+
+
+class UserBatchRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_USERS)
+
+
+async def get_dashboard_kpis(user_id: str):
+    query = async_supabase.schema("analytics") \
         .table("dashboard_kpi_cards") \
         .select("*") \
-        .eq("user_id", user_id) \
-        .execute()
+        .eq("user_id", user_id)
+    result = await order_view_rows(query, "dashboard_kpi_cards").execute()
 
     return result.data
 
 
-def get_dashboard_kpis_all_sync(user_id: str):
-    result = (
-        supabase
+async def get_dashboard_kpis_all(user_id: str):
+    result = await (
+        async_supabase
         .schema("analytics")
         .table("dashboard_kpis_all")
         .select("*")
@@ -28,34 +64,126 @@ def get_dashboard_kpis_all_sync(user_id: str):
     return result.data
 
 
-def get_activity_logs_sync(user_id: str):
-    result = supabase.schema("analytics") \
+async def get_activity_logs(user_id: str):
+    query = async_supabase.schema("analytics") \
         .table("activity_logs_view") \
         .select("*") \
-        .eq("user_id", user_id) \
-        .execute()
+        .eq("user_id", user_id)
+    result = await order_view_rows(query, "activity_logs_view").execute()
 
     return result.data
 
 
+async def load_dashboard(user_id: str):
+    cached = get_cached("dashboard", user_id)
+    if cached is not None:
+        return cached
+
+    dashboard_result, dashboard_all_result, activity_result = await asyncio.gather(
+        get_dashboard_kpis(user_id),
+        get_dashboard_kpis_all(user_id),
+        get_activity_logs(user_id)
+    )
+
+    response = {
+        "dashboard_kpis": dashboard_result,
+        "dashboard_kpis_all": dashboard_all_result,
+        "activity_logs": activity_result
+    }
+    set_cached("dashboard", user_id, response)
+    return response
+
+
 @router.get("/dashboard/{user_id}")
-async def get_dashboard(user_id: str):
+async def get_dashboard(request: Request, user_id: str, source: Literal["views", "counters"] = Query("views")):
+    if source == "counters":
+        try:
+            counters = await get_kpi_counters(user_id)
+            return {
+                "kpi_counters": {
+                    "campaigns_count": counters["campaigns_count"],
+                    **counters["totals"]
+                },
+                "age_seconds": counters["age_seconds"]
+            }
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        return await conditional_json(request, "dashboard", user_id, lambda: load_dashboard(user_id))
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _view_rows_for_chunk(view: str, user_ids: List[str]):
+    """Every row of a view for a few users, paged so PostgREST's max-rows cannot truncate it."""
+    rows = []
+    while True:
+        query = async_supabase.schema("analytics") \
+            .table(view) \
+            .select("*") \
+            .in_("user_id", user_ids) \
+            .order("user_id")
+        result = await order_view_rows(query, view) \
+            .range(len(rows), len(rows) + SCAN_PAGE_SIZE - 1) \
+            .execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < SCAN_PAGE_SIZE:
+            return rows
+
+
+async def get_view_rows_for_users(view: str, user_ids: List[str]):
+    """Fetch a view for several users, BATCH_QUERY_USERS per query, grouped by user_id."""
+    chunks = await asyncio.gather(*(
+        _view_rows_for_chunk(view, chunk) for _, chunk in chunked(user_ids, BATCH_QUERY_USERS)
+    ))
+
+    grouped = {user_id: [] for user_id in user_ids}
+    for rows in chunks:
+        for row in rows:
+            grouped.setdefault(row.get("user_id"), []).append(row)
+    return grouped
+
+
+@router.post("/dashboard/batch")
+async def get_dashboard_batch(payload: UserBatchRequest):
+    """
+    Dashboard payloads for several users, keyed by user_id, each shaped like
+    GET /dashboard/{user_id}. Cached users are served from the response cache
+    and the rest share one query per view.
+    """
+    user_ids = list(dict.fromkeys(payload.user_ids))
+    results = {}
+    missing = []
+    for user_id in user_ids:
+        cached = get_cached("dashboard", user_id)
+        if cached is not None:
+            results[user_id] = cached
+        else:
+            missing.append(user_id)
+
     try:
-        dashboard_task = asyncio.to_thread(get_dashboard_kpis_sync, user_id)
-        dashboard_all_task = asyncio.to_thread(get_dashboard_kpis_all_sync, user_id)
-        activity_task = asyncio.to_thread(get_activity_logs_sync, user_id)
-
-        dashboard_result, dashboard_all_result, activity_result = await asyncio.gather(
-            dashboard_task,
-            dashboard_all_task,
-            activity_task
-        )
-
-        return {
-            "dashboard_kpis": dashboard_result,
-            "dashboard_kpis_all": dashboard_all_result,
-            "activity_logs": activity_result
-        }
+        if missing:
+            grouped = await asyncio.gather(*(
+                get_view_rows_for_users(view, missing) for view in DASHBOARD_VIEWS.values()
+            ))
+            for user_id in missing:
+                response = {
+                    key: rows[user_id]
+                    for key, rows in zip(DASHBOARD_VIEWS, grouped)
+                }
+                set_cached("dashboard", user_id, response)
+                results[user_id] = response
+
+        return {"users": {user_id: results[user_id] for user_id in user_ids}}
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
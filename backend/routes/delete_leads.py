@@ -1,29 +1,182 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
 from supabase_client import supabase
+from utils.bulk_insert import chunked
+from utils.response_cache import invalidate_user
+from services.kpi_aggregator import kpi_aggregator
+from services.lead_dedup import lead_dedup_index
+from services.events import publish_change
 
 router = APIRouter()
 
+BULK_CHUNK_SIZE = 500
+
 
 class BulkDeleteRequest(BaseModel):
     lead_ids: List[str]
 
 
+class LeadFilter(BaseModel):
+    campaign_id: Optional[str] = None
+    status: Optional[str] = None
+    created_before: Optional[datetime] = None
+
+
+class BulkLeadOperation(BaseModel):
+    user_id: str
+    action: Literal["delete", "set_status"]
+    status: Optional[str] = None  # new status for set_status
+    lead_ids: Optional[List[str]] = None
+    filter: Optional[LeadFilter] = None
+    all: bool = False  # required to delete with no filter, i.e. every lead the user owns
+    chunk_size: int = Field(BULK_CHUNK_SIZE, ge=1, le=1000)
+
+
 @router.delete("/delete-leads")
 def delete_leads_bulk(payload: BulkDeleteRequest):
     if not payload.lead_ids:
         raise HTTPException(status_code=400, detail="No lead IDs provided")
 
-    response = (
-        supabase.table("leads")
-        .delete()
-        .in_("id", payload.lead_ids)
-        .execute()
-    )
+    # Delete in chunks so large selections stay under URL length limits
+    deleted_rows = []
+    for _, chunk in chunked(payload.lead_ids, BULK_CHUNK_SIZE):
+        response = (
+            supabase.table("leads")
+            .delete()
+            .in_("id", chunk)
+            .execute()
+        )
+        deleted_rows.extend(response.data or [])
+
+    for user_id in {row.get("user_id") for row in deleted_rows}:
+        user_rows = [row for row in deleted_rows if row.get("user_id") == user_id]
+        kpi_aggregator.leads_deleted(user_id, user_rows)
+        lead_dedup_index.invalidate(user_id)
+        invalidate_user(user_id)
+        publish_change(
+            user_id,
+            "leads_deleted",
+            delta={
+                "leads_scraped": -len(user_rows),
+                "pending": -sum(1 for row in user_rows if row.get("status") == "pending"),
+                "approved": -sum(1 for row in user_rows if row.get("status") == "approved")
+            },
+            lead_ids=[row.get("id") for row in user_rows]
+        )
 
     return {
         "status": "success",
-        "deleted_count": len(response.data or []),
+        "deleted_count": len(deleted_rows),
         "deleted_ids": payload.lead_ids
     }
+
+
+def _apply_to_chunk(payload: BulkLeadOperation, lead_ids: List[str]):
+    from postgrest import CountMethod, ReturnMethod
+
+    if payload.action == "delete":
+        query = supabase.table("leads").delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+    else:
+        query = supabase.table("leads").update(
+            {"status": payload.status},
+            count=CountMethod.exact,
+            returning=ReturnMethod.minimal
+        )
+
+    response = query.in_("id", lead_ids).eq("user_id", payload.user_id).execute()
+    return response.count or 0
+
+
+def _matching_id_chunks(payload: BulkLeadOperation):
+    """Yield chunks of lead ids matching the filter, walking the user's leads by id."""
+    last_id = None
+    while True:
+        query = supabase.table("leads").select("id").eq("user_id", payload.user_id)
+        if payload.filter.campaign_id:
+            query = query.eq("campaign_id", payload.filter.campaign_id)
+        if payload.filter.status:
+            query = query.eq("status", payload.filter.status)
+        if payload.filter.created_before:
+            query = query.lt("created_at", payload.filter.created_before.isoformat())
+        if last_id is not None:
+            query = query.gt("id", last_id)
+
+        rows = query.order("id").limit(payload.chunk_size).execute().data or []
+        if not rows:
+            return
+        ids = [row["id"] for row in rows]
+        yield ids
+        if len(ids) < payload.chunk_size:
+            return
+        last_id = ids[-1]
+
+
+@router.post("/leads/bulk")
+def bulk_lead_operation(payload: BulkLeadOperation):
+    """
+    Delete leads or change their status, selected either by id list or by
+    filter, in chunks of `chunk_size`. Always scoped to `user_id`. Deleting
+    with an empty filter (every lead of the user) needs `all: true`.
+    """
+    if payload.all and payload.filter is None and payload.lead_ids is None:
+        payload.filter = LeadFilter()
+    if (payload.lead_ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of lead_ids or filter")
+    if (
+        payload.action == "delete"
+        and payload.filter is not None
+        and not payload.filter.model_dump(exclude_none=True)
+        and not payload.all
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="Refusing to delete every lead: the filter is empty. Send all: true to confirm"
+        )
+    if payload.action == "set_status" and not payload.status:
+        raise HTTPException(status_code=400, detail="status is required for set_status")
+
+    matched = 0
+    affected = 0
+    chunks = 0
+    try:
+        if payload.lead_ids is not None:
+            id_chunks = (chunk for _, chunk in chunked(payload.lead_ids, payload.chunk_size))
+        else:
+            id_chunks = _matching_id_chunks(payload)
+
+        for ids in id_chunks:
+            matched += len(ids)
+            affected += _apply_to_chunk(payload, ids)
+            chunks += 1
+
+        if affected:
+            # Rows come back minimal, so let the counters rebuild on the next read
+            kpi_aggregator.invalidate(payload.user_id)
+            if payload.action == "delete":
+                lead_dedup_index.invalidate(payload.user_id)
+            invalidate_user(payload.user_id)
+            # Per-status deltas are unknown here; clients refetch on this event
+            publish_change(
+                payload.user_id,
+                "leads_deleted" if payload.action == "delete" else "leads_updated",
+                action=payload.action,
+                status=payload.status,
+                affected=affected
+            )
+
+        return {
+            "action": payload.action,
+            "matched": matched,
+            "affected": affected,
+            "chunks": chunks
+        }
+
+    except Exception as e:
+        if affected:
+            kpi_aggregator.invalidate(payload.user_id)
+            if payload.action == "delete":
+                lead_dedup_index.invalidate(payload.user_id)
+            invalidate_user(payload.user_id)
+        raise HTTPException(status_code=500, detail=f"Bulk operation stopped after {affected} leads: {e}")
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
+import os
+from services.events import CLOSED, event_broker
+from services.kpi_aggregator import get_kpi_counters
+from utils.json_response import dumps
+
+router = APIRouter()
+
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+
+def format_sse(event: str, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + dumps(data).decode("utf-8"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+@router.get("/events/{user_id}")
+async def stream_events(user_id: str):
+    """
+    Server-Sent Events stream of a user's changes (leads scraped, approved
+    or deleted, campaigns created) with KPI deltas. Starts with a "ready"
+    event carrying the current counters; a "resync" event means events were
+    dropped and the client should refetch.
+    """
+    subscriber = event_broker.subscribe(user_id)
+    if subscriber is None:
+        raise HTTPException(status_code=429, detail="Too many open event streams for this user")
+
+    async def events():
+        try:
+            try:
+                counters = await get_kpi_counters(user_id)
+                ready = {"totals": counters["totals"], "campaigns": counters["campaigns"]}
+            except Exception:
+                ready = {"totals": None, "campaigns": None}
+            yield format_sse("ready", ready)
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+                if message is CLOSED:
+                    return
+                yield format_sse(message["event"], message["data"], message["id"])
+        finally:
+            event_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from typing import List
+from supabase_client import supabase
+from services.jobs import job_runner
+from services.export_leads import get_approved_leads, write_temp_excel, XLSX_MEDIA_TYPE
+from services.sent_email import get_sender
+from routes.lead_scraping import ScrapedLeads, ingest_scraped_leads
+from utils.bulk_insert import chunked, DEFAULT_CHUNK_SIZE
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+class CampaignEmailJob(BaseModel):
+    user_id: str
+    campaign_id: str
+    lead_ids: List[str]
+
+
+# --- job functions (run on the job pool) ---
+
+def export_approved_job(job, user_id: str):
+    job.message = "Fetching approved leads"
+    data = get_approved_leads(user_id)
+    if not data:
+        raise Exception("No approved leads found")
+
+    job.set_progress(1, 2, "Writing workbook")
+    job.attach_file(write_temp_excel(data), "leads_approved_data.xlsx")
+    return {"rows": len(data)}
+
+
+def lead_scraping_job(job, payload: ScrapedLeads):
+    total = len(payload.leads)
+    done = 0
+
+    def on_chunk(row_count):
+        nonlocal done
+        done += row_count
+        job.set_progress(done, total, f"Inserted {done} of {total} leads")
+
+    inserted_leads, failed_chunks, activity_log, dedup = ingest_scraped_leads(
+        payload, DEFAULT_CHUNK_SIZE, on_chunk=on_chunk
+    )
+    return {
+        "inserted_count": len(inserted_leads),
+        "duplicates": dedup["duplicates"],
+        "failed_chunks": failed_chunks,
+        "activity_log_id": activity_log["id"]
+    }
+
+
+def campaign_email_job(job, payload: CampaignEmailJob):
+    job.message = "Looking up lead emails"
+    recipients = []
+    for _, chunk in chunked(payload.lead_ids, DEFAULT_CHUNK_SIZE):
+        rows = supabase.table("leads") \
+            .select("id, email") \
+            .in_("id", chunk) \
+            .eq("user_id", payload.user_id) \
+            .execute()
+        recipients.extend(row for row in (rows.data or []) if row.get("email"))
+
+    sender = get_sender()
+    futures = [
+        (row["id"], row["email"], sender.submit(row["id"], payload.user_id, payload.campaign_id, row["email"]))
+        for row in recipients
+    ]
+
+    sent, failed = [], []
+    for i, (lead_id, email, future) in enumerate(futures, 1):
+        try:
+            future.result()
+            sent.append(lead_id)
+        except Exception as e:
+            failed.append({"lead_id": lead_id, "email": email, "error": str(e)})
+        job.set_progress(i, len(futures), f"Sent {len(sent)} of {len(futures)} emails")
+
+    return {
+        "sent_count": len(sent),
+        "failed": failed,
+        "skipped_without_email": len(payload.lead_ids) - len(recipients)
+    }
+
+
+def _submit(kind: str, user_id: str, fn, *args):
+    try:
+        return job_runner.submit(kind, user_id, fn, *args).to_dict()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# --- endpoints ---
+
+@router.post("/export-approved/{user_id}", status_code=202)
+def submit_export_approved(user_id: str):
+    return _submit("export_approved", user_id, export_approved_job, user_id)
+
+
+@router.post("/lead-scraping", status_code=202)
+def submit_lead_scraping(payload: ScrapedLeads):
+    return _submit("lead_scraping", payload.user_id, lead_scraping_job, payload)
+
+
+@router.post("/campaign-emails", status_code=202)
+def submit_campaign_emails(payload: CampaignEmailJob):
+    if not payload.lead_ids:
+        raise HTTPException(status_code=400, detail="No lead IDs provided")
+    return _submit("campaign_emails", payload.user_id, campaign_email_job, payload)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/{job_id}/download")
+def download_job_result(job_id: str):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.status != "succeeded" or not job.file_path:
+        raise HTTPException(status_code=404, detail="Job has no downloadable result")
+
+    return FileResponse(job.file_path, media_type=XLSX_MEDIA_TYPE, filename=job.download_name)
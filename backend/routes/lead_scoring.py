@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from supabase_client import supabase
+from services.lead_scoring import SCORING_COLUMNS, resolve_rules, score_rows, validate_rules
+from utils.bulk_insert import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+from utils.pagination import iter_user_rows
+from utils.response_cache import invalidate_user
+
+router = APIRouter()
+
+
+class RescoreRequest(BaseModel):
+    user_id: str
+    campaign_id: Optional[str] = None  # only rescore this campaign's leads
+    chunk_size: int = Field(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE)
+    rules: Optional[Dict[str, Any]] = None  # overrides on top of the configured rules
+
+
+def _rescore_chunk(user_id: str, rows: list, titles_by_campaign: dict, rules: dict):
+    """Score one chunk per campaign and write back changed scores, one update per distinct score."""
+    from postgrest import CountMethod, ReturnMethod
+
+    by_campaign = {}
+    for row in rows:
+        by_campaign.setdefault(row.get("campaign_id"), []).append(row)
+
+    ids_by_score = {}
+    for campaign_id, campaign_rows in by_campaign.items():
+        scores = score_rows(campaign_rows, titles_by_campaign.get(campaign_id), rules).tolist()
+        for row, score in zip(campaign_rows, scores):
+            if row.get("quality_score") != score:
+                ids_by_score.setdefault(score, []).append(row["id"])
+
+    updated = 0
+    for score, ids in ids_by_score.items():
+        response = supabase.table("leads") \
+            .update({"quality_score": score}, count=CountMethod.exact, returning=ReturnMethod.minimal) \
+            .in_("id", ids) \
+            .eq("user_id", user_id) \
+            .execute()
+        updated += response.count or 0
+    return updated
+
+
+@router.post("/leads/rescore")
+def rescore_leads(payload: RescoreRequest):
+    """
+    Backfill `quality_score` for a user's existing leads (optionally one
+    campaign's), walking them in id order `chunk_size` rows at a time.
+    Only leads whose score changes are written.
+    """
+    try:
+        rules = resolve_rules(validate_rules(payload.rules) if payload.rules else None)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid rules: {e}")
+    scanned = 0
+    updated = 0
+    chunks = 0
+    try:
+        campaigns = supabase.table("campaigns") \
+            .select("id, job_titles") \
+            .eq("user_id", payload.user_id) \
+            .execute()
+        titles_by_campaign = {row["id"]: row.get("job_titles") or [] for row in (campaigns.data or [])}
+
+        eq = {"campaign_id": payload.campaign_id} if payload.campaign_id else None
+        columns = ", ".join(("campaign_id", "quality_score") + SCORING_COLUMNS)
+        chunk = []
+        for row in iter_user_rows("leads", columns, payload.user_id, page_size=payload.chunk_size, eq=eq):
+            chunk.append(row)
+            if len(chunk) >= payload.chunk_size:
+                updated += _rescore_chunk(payload.user_id, chunk, titles_by_campaign, rules)
+                scanned += len(chunk)
+                chunks += 1
+                chunk = []
+        if chunk:
+            updated += _rescore_chunk(payload.user_id, chunk, titles_by_campaign, rules)
+            scanned += len(chunk)
+            chunks += 1
+
+        if updated:
+            invalidate_user(payload.user_id)
+
+        return {
+            "scanned": scanned,
+            "updated": updated,
+            "chunks": chunks
+        }
+
+    except Exception as e:
+        if updated:
+            invalidate_user(payload.user_id)
+        raise HTTPException(status_code=500, detail=f"Rescoring stopped after {scanned} leads: {e}")
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, ValidationError
+from typing import List, Literal, Optional
 from supabase_client import supabase
 from routes.activity_log import insert_activity_log
+from utils.bulk_insert import insert_in_chunks, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+from utils.response_cache import invalidate_user
+from services.kpi_aggregator import kpi_aggregator
+from services.lead_dedup import lead_dedup_index, upsert_rows_for
+from services.lead_scoring import apply_quality_scores, get_campaign_job_titles
+from services.events import publish_change
 from datetime import datetime
+import asyncio
 import uuid
 
 router = APIRouter()
 
+MAX_LINE_BYTES = 64 * 1024
+MAX_ERROR_ROWS = 1000
+
+# What to do with a lead the user already has: drop it, or refresh the existing row
+DuplicatePolicy = Literal["skip", "upsert"]
+
 
 # Request model for each lead
 class Lead(BaseModel):
@@ -32,49 +45,262 @@ class ScrapedLeads(BaseModel):
     leads: List[Lead]
 
 
+def build_lead_row(lead: Lead, campaign_id: str, user_id: str):
+    return {
+        "id": str(uuid.uuid4()),
+        "campaign_id": campaign_id,
+        "user_id": user_id,
+        "name": lead.Employee_Name,
+        "email": lead.Work_Email,
+        "company": lead.Company,
+        "phone": lead.Work_Mobile_No,
+        "status": "pending",
+        "quality_score": None,
+        "last_contacted": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "category": lead.Category,
+        "position": lead.Position,
+        "email_status": lead.Email_Status,
+        "website": lead.Website,
+        "domain": lead.Domain,
+        "location": lead.Location,
+        "address": lead.Address,
+        "promotion_status": lead.Promotion_Status
+    }
+
+
+def write_lead_rows(user_id: str, rows: list, chunk_size: int = DEFAULT_CHUNK_SIZE, concurrency: int = 1,
+                    on_chunk=None, on_duplicate: DuplicatePolicy = "skip"):
+    """
+    Drop rows the user already has (by normalized email, else name + company
+    + domain), insert the rest in chunks and, with on_duplicate="upsert",
+    refresh the existing leads from the duplicates.
+    Returns (new_rows, inserted_rows, failed_chunks, duplicates, updated).
+    """
+    new_rows, duplicates = lead_dedup_index.partition(user_id, rows)
+
+    inserted_rows, failed_chunks = insert_in_chunks(
+        "leads",
+        new_rows,
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+        on_chunk=on_chunk
+    )
+    for chunk in failed_chunks:
+        lead_dedup_index.release(user_id, new_rows[chunk["offset"]:chunk["offset"] + chunk["size"]])
+
+    updated = 0
+    if on_duplicate == "upsert" and duplicates:
+        updated_rows, failed_upserts = insert_in_chunks(
+            "leads",
+            upsert_rows_for(duplicates),
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            upsert=True
+        )
+        updated = len(updated_rows)
+        failed_chunks += [{**chunk, "upsert": True} for chunk in failed_upserts]
+
+    return new_rows, inserted_rows, failed_chunks, len(duplicates), updated
+
+
+def ingest_scraped_leads(payload: ScrapedLeads, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         concurrency: int = 1, on_chunk=None, on_duplicate: DuplicatePolicy = "skip"):
+    lead_rows = [
+        build_lead_row(lead, payload.campaign_id, payload.user_id)
+        for lead in payload.leads
+    ]
+    apply_quality_scores(lead_rows, get_campaign_job_titles(payload.campaign_id))
+
+    # 1️⃣ Skip known leads and insert the rest as multi-row chunks
+    new_rows, inserted_leads, failed_chunks, duplicates, updated = write_lead_rows(
+        payload.user_id,
+        lead_rows,
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+        on_chunk=on_chunk,
+        on_duplicate=on_duplicate
+    )
+
+    if new_rows and not inserted_leads:
+        raise Exception(failed_chunks[0]["error"])
+    kpi_aggregator.leads_scraped(payload.user_id, payload.campaign_id, len(inserted_leads))
+
+    # 2️⃣ Insert activity log for lead scraping
+    activity_log = insert_activity_log(
+        user_id=payload.user_id,
+        campaign_id=payload.campaign_id,
+        action="Leads scraped",
+        metadata={"leads_count": len(inserted_leads), "duplicates": duplicates}
+    )
+    invalidate_user(payload.user_id)
+    publish_change(
+        payload.user_id,
+        "leads_scraped",
+        delta={"leads_scraped": len(inserted_leads), "pending": len(inserted_leads)},
+        campaign_id=payload.campaign_id,
+        inserted=len(inserted_leads),
+        duplicates=duplicates,
+        updated=updated
+    )
+
+    dedup = {"duplicates": duplicates, "updated": updated}
+    return inserted_leads, failed_chunks, activity_log, dedup
+
+
 @router.post("/lead-scraping")
-def insert_scraped_leads(payload: ScrapedLeads):
+def insert_scraped_leads(
+    payload: ScrapedLeads,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    concurrency: int = Query(1, ge=1, le=8),
+    on_duplicate: DuplicatePolicy = Query("skip")
+):
     try:
-        inserted_leads = []
-
-        # 1️⃣ Insert each lead
-        for lead in payload.leads:
-            lead_row = {
-                "id": str(uuid.uuid4()),
-                "campaign_id": payload.campaign_id,
-                "user_id": payload.user_id,
-                "name": lead.Employee_Name,
-                "email": lead.Work_Email,
-                "company": lead.Company,
-                "phone": lead.Work_Mobile_No,
-                "status": "pending",
-                "quality_score": None,
-                "last_contacted": None,
-                "created_at": datetime.utcnow().isoformat(),
-                "category": lead.Category,
-                "position": lead.Position,
-                "email_status": lead.Email_Status,
-                "website": lead.Website,
-                "domain": lead.Domain,
-                "location": lead.Location,
-                "address": lead.Address,
-                "promotion_status": lead.Promotion_Status
+        inserted_leads, failed_chunks, activity_log, dedup = ingest_scraped_leads(
+            payload, chunk_size, concurrency, on_duplicate=on_duplicate
+        )
+
+        # 3️⃣ Return both inserted leads and activity log
+        return {
+            "inserted_leads": inserted_leads,
+            "failed_chunks": failed_chunks,
+            "duplicates": dedup["duplicates"],
+            "updated": dedup["updated"],
+            "activity_log": {
+                "user_id": activity_log["user_id"],
+                "campaign_id": activity_log["campaign_id"],
+                "action": activity_log["action"],
+                "created_at": activity_log["created_at"]
             }
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _validation_error_rows(e: ValidationError):
+    return [
+        {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+        for err in e.errors()
+    ]
+
 
-            supabase.table("leads").insert(lead_row).execute()
-            inserted_leads.append(lead_row)  # keep track of inserted leads
+@router.post("/lead-scraping/stream")
+async def insert_scraped_leads_stream(
+    request: Request,
+    campaign_id: str = Query(...),
+    user_id: str = Query(...),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    on_duplicate: DuplicatePolicy = Query("skip")
+):
+    """
+    Newline-delimited JSON variant of /lead-scraping. Each line is one lead.
+    Leads are validated as they arrive and flushed to the leads table every
+    `chunk_size` rows, so at most one chunk is held in memory at a time.
+    Only counts and rejected lines are returned.
+    """
+    received = 0
+    inserted = 0
+    invalid = 0
+    failed = 0
+    duplicates = 0
+    updated = 0
+    errors = []
+    buffer = []
+    buffer_lines = []
 
-        # 2️⃣ Insert activity log for lead scraping
-        activity_log = insert_activity_log(
-            user_id=payload.user_id,
-            campaign_id=payload.campaign_id,
+    def record_error(entry: dict):
+        if len(errors) < MAX_ERROR_ROWS:
+            errors.append(entry)
+
+    async def flush():
+        nonlocal inserted, failed, duplicates, updated
+        line_by_id = {row["id"]: line for row, line in zip(buffer, buffer_lines)}
+        rows = buffer[:]
+        buffer.clear()
+        buffer_lines.clear()
+        apply_quality_scores(rows, job_titles)
+        new_rows, inserted_rows, failed_chunks, chunk_duplicates, chunk_updated = await asyncio.to_thread(
+            write_lead_rows, user_id, rows, chunk_size, on_duplicate=on_duplicate
+        )
+        inserted += len(inserted_rows)
+        duplicates += chunk_duplicates
+        updated += chunk_updated
+        kpi_aggregator.leads_scraped(user_id, campaign_id, len(inserted_rows))
+        for chunk in failed_chunks:
+            failed += chunk["size"]
+            record_error({
+                "line": None if chunk.get("upsert") else line_by_id[new_rows[chunk["offset"]]["id"]],
+                "rows": chunk["size"],
+                "error": chunk["error"],
+                **({"upsert": True} if chunk.get("upsert") else {})
+            })
+
+    def handle_line(raw: bytes, line_no: int):
+        nonlocal received, invalid
+        raw = raw.strip()
+        if not raw:
+            return
+        received += 1
+        try:
+            lead = Lead.model_validate_json(raw)
+        except ValidationError as e:
+            invalid += 1
+            record_error({"line": line_no, "errors": _validation_error_rows(e)})
+            return
+        buffer.append(build_lead_row(lead, campaign_id, user_id))
+        buffer_lines.append(line_no)
+
+    try:
+        job_titles = await asyncio.to_thread(get_campaign_job_titles, campaign_id)
+        pending = b""
+        line_no = 0
+        async for data in request.stream():
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for raw in lines:
+                line_no += 1
+                handle_line(raw, line_no)
+                if len(buffer) >= chunk_size:
+                    await flush()
+            if len(pending) > MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Line {line_no + 1} exceeds {MAX_LINE_BYTES} bytes"
+                )
+
+        if pending:
+            line_no += 1
+            handle_line(pending, line_no)
+        if buffer:
+            await flush()
+
+        activity_log = await asyncio.to_thread(
+            insert_activity_log,
+            user_id=user_id,
+            campaign_id=campaign_id,
             action="Leads scraped",
-            metadata={"leads_count": len(payload.leads)}  # optional metadata
+            metadata={"leads_count": inserted, "duplicates": duplicates}
+        )
+        invalidate_user(user_id)
+        publish_change(
+            user_id,
+            "leads_scraped",
+            delta={"leads_scraped": inserted, "pending": inserted},
+            campaign_id=campaign_id,
+            inserted=inserted,
+            duplicates=duplicates,
+            updated=updated
         )
 
-        # 3️⃣ Return both inserted leads and activity log
         return {
-            "inserted_leads": inserted_leads,
+            "received": received,
+            "inserted": inserted,
+            "duplicates": duplicates,
+            "updated": updated,
+            "invalid": invalid,
+            "failed": failed,
+            "errors": errors,
             "activity_log": {
                 "user_id": activity_log["user_id"],
                 "campaign_id": activity_log["campaign_id"],
@@ -83,5 +309,7 @@ def insert_scraped_leads(payload: ScrapedLeads):
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
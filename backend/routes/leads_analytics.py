@@ -1,48 +1,138 @@
-from fastapi import APIRouter, HTTPException
-from supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import asyncio
+from async_supabase_client import async_supabase
+from utils.response_cache import get_cached, set_cached
+from utils.pagination import keyset_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.etag import conditional_json
+from utils.json_response import FastJSONResponse
+from utils.resilience import CircuitOpenError
 
 router = APIRouter()
 
+# Statuses the leads views split on
+LEAD_STATUSES = ("pending", "approved")
 
-@router.get("/lead-analytics/{user_id}")
-def get_lead_list(user_id: str):
-    try:
 
-        result = (
-            supabase.schema("analytics")
-            .table("lead_analytics")
-            .select("*")
-            .eq("user_id", user_id)
-            .execute()
-        )
+def lead_list_cache_key(cursor: Optional[str], limit: int, fetch_all: bool):
+    return "lead_analytics:all" if fetch_all else f"lead_analytics:{cursor}:{limit}"
 
-        return {
-            "lead_list": result.data
+
+async def load_lead_list(user_id: str, cursor: Optional[str], limit: int, fetch_all: bool):
+    cache_key = lead_list_cache_key(cursor, limit, fetch_all)
+    cached = get_cached(cache_key, user_id)
+    if cached is not None:
+        return cached
+
+    query = (
+        async_supabase.schema("analytics")
+        .table("lead_analytics")
+        .select("*")
+        .eq("user_id", user_id)
+    )
+
+    if fetch_all:
+        response = {
+            "lead_list": (await query.execute()).data
         }
+    else:
+        rows, next_cursor = await keyset_page(query, cursor, limit, id_column="lead_id")
+        response = {
+            "lead_list": rows,
+            "next_cursor": next_cursor
+        }
+
+    set_cached(cache_key, user_id, response)
+    return response
 
+
+@router.get("/lead-analytics/{user_id}")
+async def get_lead_list(
+    request: Request,
+    user_id: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fetch_all: bool = Query(False, alias="all", description="Return every row in one response (unpaginated)")
+):
+    try:
+        return await conditional_json(
+            request,
+            lead_list_cache_key(cursor, limit, fetch_all),
+            user_id,
+            lambda: load_lead_list(user_id, cursor, limit, fetch_all)
+        )
+
+    except (HTTPException, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def count_leads(user_id: str, status: Optional[str] = None):
+    query = (
+        async_supabase.table("leads")
+        .select("id", count="exact", head=True)
+        .eq("user_id", user_id)
+    )
+    if status:
+        query = query.eq("status", status)
+    result = await query.execute()
+    return result.count or 0
+
+
 @router.get("/leads/{user_id}")
-def get_user_leads(user_id: str):
+async def get_user_leads(
+    user_id: str,
+    status: Optional[str] = Query(None, description="Only return leads with this status"),
+    counts_only: bool = Query(False, description="Return only lead counts by status"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fetch_all: bool = Query(False, alias="all", description="Return every lead in one response (unpaginated)")
+):
     try:
-        result = (
-            supabase.table("leads")
+        if counts_only:
+            statuses = [status] if status else list(LEAD_STATUSES)
+            totals = await asyncio.gather(
+                count_leads(user_id),
+                *(count_leads(user_id, s) for s in statuses)
+            )
+            return {
+                "total": totals[0],
+                "counts": dict(zip(statuses, totals[1:]))
+            }
+
+        query = (
+            async_supabase.table("leads")
             .select("*")
             .eq("user_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
         )
+        if status:
+            query = query.eq("status", status)
+        else:
+            query = query.in_("status", list(LEAD_STATUSES))
 
-        leads = result.data or []
-        pending_leads = [l for l in leads if l.get("status") == "pending"]
-        approved_leads = [l for l in leads if l.get("status") == "approved"]
+        next_cursor = None
+        if fetch_all:
+            leads = (await query.order("created_at", desc=True).execute()).data or []
+        else:
+            leads, next_cursor = await keyset_page(query, cursor, limit)
 
-        return {
-            "pending_leads": pending_leads,
-            "approved_leads": approved_leads
-        }
+        if status:
+            response = {
+                "status": status,
+                "leads": leads
+            }
+        else:
+            response = {
+                "pending_leads": [l for l in leads if l.get("status") == "pending"],
+                "approved_leads": [l for l in leads if l.get("status") == "approved"]
+            }
+        if not fetch_all:
+            response["next_cursor"] = next_cursor
+        # Rows are plain JSON from PostgREST, so skip jsonable_encoder
+        return FastJSONResponse(response)
 
+    except (HTTPException, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,7 +3,9 @@ from pydantic import BaseModel
 from typing import List, Optional
 from supabase_client import supabase
 from routes.activity_log import insert_activity_log
-from services.sent_email import send_email
+from utils.response_cache import invalidate_user
+from services.kpi_aggregator import kpi_aggregator
+from services.events import publish_change
 from datetime import datetime
 import uuid
 
@@ -27,42 +29,57 @@ class LeadsApprovalRequest(BaseModel):
 @router.post("/leads-approved")
 def approve_leads(payload: LeadsApprovalRequest):
     try:
-        updated_leads = []
+        approved_ids = [lead.lead_id for lead in payload.leads if lead.approved]
+        updated_leads = [
+            {"lead_id": lead_id, "status": "approved"}
+            for lead_id in approved_ids
+        ]
+        newly_approved_count = 0
+        pending_approved_count = 0
 
-        # 1️⃣ Update leads table
-        for lead in payload.leads:
-            if lead.approved:
-                supabase.table("leads") \
+        if approved_ids:
+            # 1️⃣ Update leads table set-wise; only rows that change status come back.
+            # Pending leads go first so the KPI counters know each row's previous status.
+            from_pending = supabase.table("leads") \
+                .update({"status": "approved"}) \
+                .in_("id", approved_ids) \
+                .eq("user_id", payload.user_id) \
+                .eq("status", "pending") \
+                .execute().data or []
+            from_other = []
+            if len(from_pending) < len(approved_ids):
+                from_other = supabase.table("leads") \
                     .update({"status": "approved"}) \
-                    .eq("id", lead.lead_id) \
+                    .in_("id", approved_ids) \
                     .eq("user_id", payload.user_id) \
-                    .execute()
+                    .neq("status", "approved") \
+                    .execute().data or []
 
-                updated_leads.append({
-                    "lead_id": lead.lead_id,
-                    "status": "approved"
-                })
-
-        # 2️⃣ Insert email events and send emails
-        for lead in payload.leads:
-            if lead.approved:
-                # Fetch email from leads table
-                lead_row = supabase.table("leads") \
-                    .select("email") \
-                    .eq("id", lead.lead_id) \
-                    .single() \
-                    .execute()
-                lead_email = lead_row.data.get("email") if lead_row.data else None
-
-                email_event = {
+            # 2️⃣ Insert email events as one multi-row insert
+            created_at = datetime.utcnow().isoformat()
+            email_events = [
+                {
                     "id": str(uuid.uuid4()),
                     "user_id": payload.user_id,
                     "campaign_id": payload.campaign_id,
-                    "lead_id": lead.lead_id,
+                    "lead_id": lead_id,
                     "event_type": payload.type,
-                    "created_at": datetime.utcnow().isoformat()
+                    "created_at": created_at
                 }
-                supabase.table("email_events").insert(email_event).execute()
+                for lead_id in approved_ids
+            ]
+            supabase.table("email_events").insert(email_events).execute()
+
+            newly_approved_count = len(from_pending) + len(from_other)
+            pending_approved_count = len(from_pending)
+            kpi_aggregator.leads_approved(
+                payload.user_id,
+                from_pending,
+                from_other,
+                payload.campaign_id,
+                payload.type,
+                len(email_events)
+            )
 
         # 3️⃣ Insert activity log
         activity_log = insert_activity_log(
@@ -71,6 +88,18 @@ def approve_leads(payload: LeadsApprovalRequest):
             action="Leads approved",
             metadata={"leads": [lead.dict() for lead in payload.leads]}
         )
+        invalidate_user(payload.user_id)
+        publish_change(
+            payload.user_id,
+            "leads_approved",
+            delta={
+                "pending": -pending_approved_count,
+                "approved": newly_approved_count,
+                "email_events": {payload.type: len(approved_ids)} if approved_ids else {}
+            },
+            campaign_id=payload.campaign_id,
+            lead_ids=approved_ids
+        )
 
         # 4️⃣ Return response
         return {
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, HTTPException
-from supabase_client import supabase
+from async_supabase_client import async_supabase
 
 router = APIRouter()
 
-def get_profile(user_id: str):
-    result = supabase.schema("public") \
+async def get_profile(user_id: str):
+    result = await async_supabase.schema("public") \
         .table("profiles") \
         .select("first_name","last_name","company_name") \
         .eq("id", user_id) \
@@ -13,8 +13,8 @@ def get_profile(user_id: str):
     return result.data
 
 @router.get("/profile/{user_id}")
-def profile(user_id: str):
-    data = get_profile(user_id)
+async def profile(user_id: str):
+    data = await get_profile(user_id)
     if not data:
         raise HTTPException(status_code=404, detail="Profile not found")
     return data[0]
@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import os
+import signal
+import threading
+import time
+from services.kpi_aggregator import kpi_aggregator
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+MAX_SUBSCRIBERS_PER_USER = int(os.getenv("MAX_SUBSCRIBERS_PER_USER", "10"))
+
+# Sentinel pushed to subscribers when the broker shuts down
+CLOSED = object()
+
+
+class Subscriber:
+    """
+    One open event stream. Its queue is bounded; when a consumer falls
+    behind, the backlog is dropped and replaced by a single "resync" event
+    telling the client to refetch instead of replaying every change.
+    """
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event):
+        """Runs on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            while not self.queue.empty():
+                if self.queue.get_nowait()["event"] != "resync":
+                    self.dropped += 1
+            self.queue.put_nowait({
+                "id": event["id"],
+                "event": "resync",
+                "data": {"reason": "slow consumer", "dropped": self.dropped}
+            })
+
+    def close(self):
+        """Runs on the subscriber's event loop; ends the stream even if the queue is full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSED)
+
+
+class EventBroker:
+    """
+    In-process fan-out of per-user change events to open SSE streams.
+    publish() may be called from any thread; delivery is handed to each
+    subscriber's event loop. Only streams connected to this worker see
+    events published by this worker.
+    """
+
+    def __init__(self, max_queue: int = EVENT_QUEUE_SIZE, max_per_user: int = MAX_SUBSCRIBERS_PER_USER):
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id: str):
+        """Register a stream for the running event loop; None when the user has too many open."""
+        subscriber = Subscriber(user_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            streams = self._subscribers.setdefault(user_id, set())
+            if len(streams) >= self.max_per_user:
+                return None
+            streams.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            streams = self._subscribers.get(subscriber.user_id)
+            if streams is not None:
+                streams.discard(subscriber)
+                if not streams:
+                    del self._subscribers[subscriber.user_id]
+
+    def publish(self, user_id: str, event: str, data: dict):
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        if not streams:
+            return 0
+
+        message = {"id": next(self._ids), "event": event, "data": data}
+        for subscriber in streams:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+            except RuntimeError:
+                # Loop already closed; the stream is gone
+                self.unsubscribe(subscriber)
+        return len(streams)
+
+    def close(self):
+        """End every open stream, e.g. on shutdown."""
+        with self._lock:
+            streams = [s for user_streams in self._subscribers.values() for s in user_streams]
+            self._subscribers = {}
+        for subscriber in streams:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.close)
+            except RuntimeError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "subscribers": sum(len(streams) for streams in self._subscribers.values())
+            }
+
+
+event_broker = EventBroker()
+
+
+def close_streams_on_exit_signal(loop: asyncio.AbstractEventLoop, broker: EventBroker = event_broker):
+    """
+    Uvicorn waits for open connections to finish before running lifespan
+    shutdown, and an SSE stream never finishes on its own. Chain onto the
+    server's SIGINT/SIGTERM handlers so streams end as soon as shutdown
+    starts. The close is scheduled on the loop; a signal handler must not
+    take the broker lock the interrupted code may hold.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(broker.close)
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        signal.signal(sig, handler)
+
+
+def publish_change(user_id: str, event: str, delta: dict = None, **data):
+    """
+    Publish a committed write to the user's streams: what changed, the KPI
+    delta it caused and, when loaded in memory, the updated counter totals.
+    """
+    if not user_id:
+        return
+    counters = kpi_aggregator.peek(user_id)
+    event_broker.publish(user_id, event, {
+        **data,
+        "delta": delta or {},
+        "totals": counters["totals"] if counters else None,
+        "at": time.time()
+    })
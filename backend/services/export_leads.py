@@ -1,9 +1,12 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 from supabase_client import supabase
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
 from typing import List
+import os
+import tempfile
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 router = APIRouter()
 
@@ -26,34 +29,74 @@ def get_specific_leads_by_id(user_id: str, lead_ids: List[str]):
     return result.data
 
 def create_excel(data: list, file_name: str):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Leads Data"
-
     if not data:
         return None
 
+    # openpyxl is only needed by the export paths; import it on first use
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
     headers = list(data[0].keys())
-    ws.append(headers)
+
+    # Column widths are computed from the raw rows; write-only sheets need
+    # them set before the first row is streamed out.
+    widths = [len(str(header)) for header in headers]
+    for row in data:
+        for i, value in enumerate(row.values()):
+            if value and i < len(widths):
+                widths[i] = max(widths[i], len(str(value)))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Leads Data")
+    for col_num, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = width + 2
 
     header_fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
-    for col_num, _ in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
+        header_row.append(cell)
+    ws.append(header_row)
 
     for row in data:
         ws.append(list(row.values()))
 
-    for col in ws.columns:
-        max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = max_length + 2
-
     wb.save(file_name)
     return file_name
 
 
+def write_temp_excel(data: list):
+    """Write the workbook to a unique temp file and return its path."""
+    fd, path = tempfile.mkstemp(prefix="leads_export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        create_excel(data, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def excel_file_response(data: list, download_name: str):
+    """
+    Write the workbook to a per-request temp file and return a response
+    that streams it and deletes it once sent.
+    """
+    path = write_temp_excel(data)
+
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename=download_name,
+        background=BackgroundTask(os.remove, path)
+    )
+
+
 @router.get("/export_specific_leads/{user_id}")
 def export_specific_leads(user_id: str, lead_ids: List[str] = Query(None)):
     if not lead_ids:
@@ -64,14 +107,7 @@ def export_specific_leads(user_id: str, lead_ids: List[str] = Query(None)):
     if not data:
         raise HTTPException(status_code=404, detail="No leads found for the selected IDs")
 
-    file_name = "leads_data.xlsx"
-    create_excel(data, file_name)
-
-    return FileResponse(
-        file_name,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        filename=file_name
-    )
+    return excel_file_response(data, "leads_data.xlsx")
 
 
 @router.get("/export_approved/{user_id}")
@@ -80,11 +116,4 @@ def export_approved_leads(user_id: str):
     if not data:
         raise HTTPException(status_code=404, detail="No approved leads found")
 
-    file_name = "leads_approved_data.xlsx"
-    create_excel(data, file_name)
-
-    return FileResponse(
-        file_name,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        filename=file_name
-    )
+    return excel_file_response(data, "leads_approved_data.xlsx")
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+# Cap on queued + running jobs; finished jobs beyond it are evicted oldest first
+MAX_JOBS = int(os.getenv("MAX_JOBS", "1000"))
+
+
+class Job:
+    def __init__(self, kind: str, user_id: str):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.user_id = user_id
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = None
+        self.result = None
+        self.error = None
+        self.file_path = None
+        self.download_name = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self._finished_monotonic = None
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def set_progress(self, done: int, total: int, message: str = None):
+        self.progress = round(done / total, 4) if total else 1.0
+        if message is not None:
+            self.message = message
+
+    def attach_file(self, path: str, download_name: str):
+        self.file_path = path
+        self.download_name = download_name
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "user_id": self.user_id,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "download_url": f"/jobs/{self.id}/download" if self.file_path and self.status == "succeeded" else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobRunner:
+    """
+    Runs long operations on a bounded thread pool and keeps their status,
+    progress and results in memory for JOB_RESULT_TTL seconds. At most
+    `max_jobs` jobs may be queued or running; when the table is full the
+    oldest finished jobs make room. Job functions receive the Job as their
+    first argument to report progress and attach result files.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, result_ttl: float = JOB_RESULT_TTL,
+                 max_jobs: int = MAX_JOBS):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def submit(self, kind: str, user_id: str, fn, *args, **kwargs) -> Job:
+        job = Job(kind, user_id)
+        with self._lock:
+            self._prune()
+            active = sum(1 for existing in self._jobs.values() if not existing.finished)
+            if active >= self.max_jobs:
+                raise RuntimeError("Too many jobs in progress, try again later")
+            self._evict_finished(len(self._jobs) + 1 - self.max_jobs)
+            self._jobs[job.id] = job
+            self._pool().submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn, args, kwargs):
+        with self._lock:
+            if job.status != "queued":
+                # Cancelled by shutdown() before a worker picked it up
+                return
+            job.status = "running"
+        job.started_at = datetime.utcnow().isoformat()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow().isoformat()
+            job._finished_monotonic = time.monotonic()
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [
+            job for job in self._jobs.values()
+            if job._finished_monotonic is not None and now - job._finished_monotonic > self.result_ttl
+        ]
+        for job in expired:
+            del self._jobs[job.id]
+            _remove_file(job.file_path)
+
+    def _evict_finished(self, count: int):
+        if count <= 0:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job._finished_monotonic or 0
+        )
+        for job in finished[:count]:
+            del self._jobs[job.id]
+            _remove_file(job.file_path)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+            self._jobs = {}
+            # Queued jobs will never run; record that instead of leaving them "queued"
+            now = datetime.utcnow().isoformat()
+            for job in jobs:
+                if job.status == "queued":
+                    job.status = "cancelled"
+                    job.error = "Cancelled: server shutting down"
+                    job.finished_at = now
+                    job._finished_monotonic = time.monotonic()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for job in jobs:
+            _remove_file(job.file_path)
+
+
+def _remove_file(path: str):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+job_runner = JobRunner()
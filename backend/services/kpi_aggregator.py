@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import metrics
+from utils.pagination import iter_user_rows
+
+logger = logging.getLogger(__name__)
+
+# Counters are rebuilt from the base tables after this many seconds, which
+# bounds drift from writes handled by other workers
+KPI_COUNTER_MAX_AGE = float(os.getenv("KPI_COUNTER_MAX_AGE", "300"))
+KPI_COUNTER_MAX_USERS = int(os.getenv("KPI_COUNTER_MAX_USERS", "5000"))
+
+
+def _empty_counters():
+    return {
+        "leads_scraped": 0,
+        "pending": 0,
+        "approved": 0,
+        "email_events": {}
+    }
+
+
+def _apply(counters: dict, scraped: int = 0, pending: int = 0, approved: int = 0, events: dict = None):
+    """Add a delta and return the counters that would have gone negative (clamped at 0)."""
+    clamped = []
+    for key, amount in (("leads_scraped", scraped), ("pending", pending), ("approved", approved)):
+        value = counters[key] + amount
+        if value < 0:
+            clamped.append(key)
+            value = 0
+        counters[key] = value
+    for event_type, count in (events or {}).items():
+        counters["email_events"][event_type] = counters["email_events"].get(event_type, 0) + count
+    return clamped
+
+
+class _UserKPIs:
+    def __init__(self):
+        self.totals = _empty_counters()
+        self.campaigns = {}
+        self.built_at = time.monotonic()
+
+    def campaign(self, campaign_id: str):
+        if campaign_id not in self.campaigns:
+            self.campaigns[campaign_id] = _empty_counters()
+        return self.campaigns[campaign_id]
+
+    def apply(self, campaign_id: str, **delta):
+        clamped = _apply(self.totals, **delta)
+        if campaign_id:
+            clamped += _apply(self.campaign(campaign_id), **delta)
+        return clamped
+
+
+class KPIAggregator:
+    """
+    Per-user and per-campaign lead and email-event counters. Write endpoints
+    feed deltas in, reads are served from memory, and a user's counters are
+    rebuilt from the leads, campaigns and email_events tables when missing,
+    invalidated or older than KPI_COUNTER_MAX_AGE.
+    """
+
+    def __init__(self, max_age: float = KPI_COUNTER_MAX_AGE, max_users: int = KPI_COUNTER_MAX_USERS):
+        self.max_age = max_age
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self._rebuilding = set()
+        self._raced = set()
+
+    # --- reads ---
+
+    def _fresh(self, user_id: str):
+        state = self._users.get(user_id)
+        if state is None or time.monotonic() - state.built_at > self.max_age:
+            return None
+        self._users.move_to_end(user_id)
+        return state
+
+    def _snapshot(self, user_id: str, state: _UserKPIs):
+        return {
+            "user_id": user_id,
+            "campaigns_count": len(state.campaigns),
+            "totals": {**state.totals, "email_events": dict(state.totals["email_events"])},
+            "campaigns": {
+                campaign_id: {**counters, "email_events": dict(counters["email_events"])}
+                for campaign_id, counters in state.campaigns.items()
+            },
+            "age_seconds": round(time.monotonic() - state.built_at, 3)
+        }
+
+    def peek(self, user_id: str):
+        """Return the counters if they are loaded and fresh, without touching the database."""
+        with self._lock:
+            state = self._fresh(user_id)
+            return self._snapshot(user_id, state) if state else None
+
+    def snapshot(self, user_id: str):
+        snapshot = self.peek(user_id)
+        if snapshot is not None:
+            return snapshot
+        self.rebuild(user_id)
+        with self._lock:
+            state = self._users.get(user_id)
+            return self._snapshot(user_id, state) if state else None
+
+    def rebuild(self, user_id: str):
+        with self._lock:
+            self._rebuilding.add(user_id)
+            self._raced.discard(user_id)
+
+        try:
+            state = _UserKPIs()
+            for row in iter_user_rows("campaigns", "user_id", user_id):
+                state.campaign(row["id"])
+            for row in iter_user_rows("leads", "campaign_id, status", user_id):
+                status = row.get("status")
+                state.apply(
+                    row.get("campaign_id"),
+                    scraped=1,
+                    pending=1 if status == "pending" else 0,
+                    approved=1 if status == "approved" else 0
+                )
+            for row in iter_user_rows("email_events", "campaign_id, event_type", user_id):
+                state.apply(row.get("campaign_id"), events={row.get("event_type"): 1})
+        finally:
+            with self._lock:
+                self._rebuilding.discard(user_id)
+
+        with self._lock:
+            if user_id in self._raced:
+                # A write landed mid-rebuild; serve these counters but rebuild on the next read
+                self._raced.discard(user_id)
+                state.built_at = 0
+            self._users[user_id] = state
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    # --- deltas from write endpoints ---
+
+    def _delta(self, user_id: str, campaign_id: str, **delta):
+        with self._lock:
+            if user_id in self._rebuilding:
+                self._raced.add(user_id)
+            state = self._users.get(user_id)
+            if state is None:
+                return
+            clamped = state.apply(campaign_id, **delta)
+            if clamped:
+                # A counter went below zero, so it had drifted from the tables: rebuild on the next read
+                self._users.pop(user_id, None)
+        if clamped:
+            metrics.inc_counter("kpi_counters_clamped_total")
+            logger.warning("KPI counters %s for user %s went negative; dropped them for a rebuild",
+                           sorted(set(clamped)), user_id)
+
+    def campaign_created(self, user_id: str, campaign_id: str):
+        with self._lock:
+            if user_id in self._rebuilding:
+                self._raced.add(user_id)
+            state = self._users.get(user_id)
+            if state is not None:
+                state.campaign(campaign_id)
+
+    def leads_scraped(self, user_id: str, campaign_id: str, count: int):
+        if count:
+            self._delta(user_id, campaign_id, scraped=count, pending=count)
+
+    def leads_approved(self, user_id: str, from_pending: list, from_other: list, campaign_id: str,
+                       event_type: str, event_count: int):
+        """
+        Leads whose status actually changed to approved, split by previous
+        status: only those that were pending leave the pending counter.
+        """
+        for row in from_pending:
+            self._delta(user_id, row.get("campaign_id"), pending=-1, approved=1)
+        for row in from_other:
+            self._delta(user_id, row.get("campaign_id"), approved=1)
+        if event_count:
+            self._delta(user_id, campaign_id, events={event_type: event_count})
+
+    def leads_deleted(self, user_id: str, deleted_rows: list):
+        for row in deleted_rows:
+            status = row.get("status")
+            self._delta(
+                user_id,
+                row.get("campaign_id"),
+                scraped=-1,
+                pending=-1 if status == "pending" else 0,
+                approved=-1 if status == "approved" else 0
+            )
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            if user_id in self._rebuilding:
+                self._raced.add(user_id)
+            self._users.pop(user_id, None)
+
+
+kpi_aggregator = KPIAggregator()
+
+
+async def get_kpi_counters(user_id: str):
+    """Serve counters from memory, rebuilding off the event loop only when they are stale."""
+    snapshot = kpi_aggregator.peek(user_id)
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(kpi_aggregator.snapshot, user_id)
+    return snapshot
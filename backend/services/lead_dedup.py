@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from utils.pagination import iter_user_rows
+
+DEDUP_INDEX_TTL = float(os.getenv("DEDUP_INDEX_TTL", "900"))
+DEDUP_MAX_KEYS = int(os.getenv("DEDUP_MAX_KEYS", "1000000"))
+
+# Columns not overwritten when a duplicate is upserted onto the existing lead
+UPSERT_PRESERVED_COLUMNS = ("id", "campaign_id", "status", "last_contacted", "created_at")
+
+
+def _normalize(value):
+    return " ".join(str(value).split()).lower() if value else ""
+
+
+def dedup_key(row: dict):
+    """Normalized email, else name + company + domain; None when there is nothing to match on."""
+    email = _normalize(row.get("email"))
+    if email:
+        return "e:" + email
+    name, company, domain = (_normalize(row.get(col)) for col in ("name", "company", "domain"))
+    if not (name and (company or domain)):
+        return None
+    return f"n:{name}|{company}|{domain}"
+
+
+class _UserIndex:
+    def __init__(self, keys: dict, generation: int):
+        self.keys = keys
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+
+
+class LeadDedupIndex:
+    """
+    Per-user map of dedup key -> existing lead id. A user's index is loaded
+    from the leads table on first use, reloaded after DEDUP_INDEX_TTL (so
+    inserts from other workers are picked up) and evicted least recently
+    used once more than DEDUP_MAX_KEYS keys are held across all users.
+    """
+
+    def __init__(self, ttl: float = DEDUP_INDEX_TTL, max_keys: int = DEDUP_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._users = OrderedDict()
+        self._total_keys = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # Bumped by invalidate(); an index loaded under an older generation is stale
+        self._generations = {}
+
+    def _load(self, user_id: str, generation: int):
+        keys = {}
+        for row in iter_user_rows("leads", "email, name, company, domain", user_id):
+            key = dedup_key(row)
+            if key is not None:
+                keys.setdefault(key, row["id"])
+        return _UserIndex(keys, generation)
+
+    def _fresh(self, user_id: str):
+        index = self._users.get(user_id)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl:
+            return None
+        self._users.move_to_end(user_id)
+        return index
+
+    def _ensure(self, user_id: str):
+        with self._lock:
+            index = self._fresh(user_id)
+            if index is not None:
+                return index
+            load_lock = self._load_locks.setdefault(user_id, threading.Lock())
+
+        # One load per user at a time; concurrent callers wait and reuse it
+        with load_lock:
+            while True:
+                with self._lock:
+                    index = self._fresh(user_id)
+                    generation = self._generations.get(user_id, 0)
+                if index is not None:
+                    return index
+                index = self._load(user_id, generation)
+                with self._lock:
+                    if self._generations.get(user_id, 0) != generation:
+                        # Invalidated (e.g. leads deleted) while loading; load again
+                        continue
+                    previous = self._users.pop(user_id, None)
+                    if previous is not None:
+                        self._total_keys -= len(previous.keys)
+                    self._users[user_id] = index
+                    self._total_keys += len(index.keys)
+                    self._load_locks.pop(user_id, None)
+                    self._evict(keep=user_id)
+                return index
+
+    def _evict(self, keep: str):
+        while self._total_keys > self.max_keys and len(self._users) > 1:
+            user_id, index = next(iter(self._users.items()))
+            if user_id == keep:
+                self._users.move_to_end(user_id)
+                continue
+            del self._users[user_id]
+            self._total_keys -= len(index.keys)
+
+    def partition(self, user_id: str, rows: list):
+        """
+        Split freshly built lead rows into (new_rows, duplicates). New rows
+        are reserved in the index straight away so concurrent batches and
+        repeats within a batch are caught. Each duplicate is
+        (row, existing_lead_id), where the id is None for a repeat within
+        this batch.
+        """
+        while True:
+            index = self._ensure(user_id)
+            with self._lock:
+                if index.generation != self._generations.get(user_id, 0):
+                    # Invalidated since it was loaded: its keys may match deleted leads
+                    continue
+                current = self._users.get(user_id)
+                if current is None:
+                    # Evicted since it was loaded; the keys are still current, put it back
+                    self._users[user_id] = index
+                    self._total_keys += len(index.keys)
+                else:
+                    index = current
+
+                new_rows = []
+                duplicates = []
+                batch_keys = set()
+                for row in rows:
+                    key = dedup_key(row)
+                    if key is None:
+                        new_rows.append(row)
+                    elif key in index.keys:
+                        existing_id = index.keys[key]
+                        duplicates.append((row, None if key in batch_keys else existing_id))
+                    else:
+                        index.keys[key] = row["id"]
+                        batch_keys.add(key)
+                        new_rows.append(row)
+                self._total_keys += len(batch_keys)
+                self._evict(keep=user_id)
+                return new_rows, duplicates
+
+    def release(self, user_id: str, rows: list):
+        """Drop reservations for rows that were not inserted after all."""
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                return
+            for row in rows:
+                key = dedup_key(row)
+                if key is not None and index.keys.get(key) == row["id"]:
+                    del index.keys[key]
+                    self._total_keys -= 1
+
+    def invalidate(self, user_id: str):
+        """Forget a user's index, e.g. after leads were deleted; it reloads on next use."""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            index = self._users.pop(user_id, None)
+            if index is not None:
+                self._total_keys -= len(index.keys)
+
+
+lead_dedup_index = LeadDedupIndex()
+
+
+def upsert_rows_for(duplicates: list):
+    """
+    Rows that refresh the existing leads with the newly scraped fields.
+    One row per existing lead (the last duplicate wins), as an upsert may
+    not touch the same row twice.
+    """
+    rows = {}
+    for row, existing_id in duplicates:
+        if existing_id is not None:
+            rows[existing_id] = {
+                **{k: v for k, v in row.items() if k not in UPSERT_PRESERVED_COLUMNS},
+                "id": existing_id
+            }
+    return list(rows.values())
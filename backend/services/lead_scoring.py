@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+from supabase_client import supabase
+from utils.cache import TTLCache
+
+# Points per signal; the total is capped at max_score. Override any of these
+# with a JSON object in LEAD_SCORING_RULES, e.g. '{"has_phone": 20}'.
+DEFAULT_SCORING_RULES = {
+    "email_status": {
+        "valid": 40,
+        "catch-all": 20,
+        "accept_all": 20,
+        "unknown": 10,
+        "invalid": 0
+    },
+    "has_phone": 15,
+    "has_website": 10,
+    "has_domain": 10,
+    "position_match": 25,
+    "max_score": 100
+}
+
+# Lead row columns the scorer reads
+SCORING_COLUMNS = ("email_status", "phone", "website", "domain", "position")
+
+campaign_titles_cache = TTLCache(
+    maxsize=int(os.getenv("CAMPAIGN_TITLES_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CAMPAIGN_TITLES_CACHE_TTL", "300"))
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def validate_rules(source: dict):
+    """Check a rules override against DEFAULT_SCORING_RULES; raises ValueError when malformed."""
+    if not isinstance(source, dict):
+        raise ValueError("scoring rules must be a JSON object")
+    for key, value in source.items():
+        if key not in DEFAULT_SCORING_RULES:
+            raise ValueError(f"unknown scoring rule {key!r}")
+        if key == "email_status":
+            if not isinstance(value, dict) or not all(
+                isinstance(points, (int, float)) and not isinstance(points, bool) for points in value.values()
+            ):
+                raise ValueError("email_status must map statuses to points")
+        elif not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"scoring rule {key!r} must be a number")
+    return source
+
+
+def _load_env_rules():
+    """LEAD_SCORING_RULES, parsed once at import; a malformed value falls back to the defaults."""
+    raw = os.getenv("LEAD_SCORING_RULES")
+    if not raw:
+        return {}
+    try:
+        return validate_rules(json.loads(raw))
+    except ValueError as e:
+        logger.warning("Ignoring LEAD_SCORING_RULES, using the default scoring rules: %s", e)
+        return {}
+
+
+ENV_SCORING_RULES = _load_env_rules()
+
+
+def resolve_rules(overrides: dict = None):
+    """Defaults, then LEAD_SCORING_RULES, then `overrides` (validated by the caller)."""
+    rules = {**DEFAULT_SCORING_RULES, "email_status": dict(DEFAULT_SCORING_RULES["email_status"])}
+    for source in (ENV_SCORING_RULES, overrides or {}):
+        for key, value in source.items():
+            if key == "email_status":
+                rules["email_status"].update({k.lower(): v for k, v in value.items()})
+            else:
+                rules[key] = value
+    return rules
+
+
+_np = None
+
+
+def _numpy():
+    """numpy, imported on the first scored batch rather than at app startup."""
+    global _np
+    if _np is None:
+        import numpy
+        _np = numpy
+    return _np
+
+
+# Punctuation treated as a word break when matching positions to job titles
+_WORD_BREAKS = str.maketrans({c: " " for c in "-,/&()|.;:"})
+
+
+def _words(value: str):
+    """Lower-case words of a value, padded with spaces for whole-word substring search."""
+    return " " + " ".join((value or "").lower().translate(_WORD_BREAKS).split()) + " "
+
+
+def _factorize(rows: list, column: str):
+    """
+    Encode a column as (codes, uniques): an int array with one code per row
+    and the distinct raw values. Rules are then evaluated once per distinct
+    value and broadcast back to the rows with a single gather.
+    """
+    np = _numpy()
+    uniques = {}
+    codes = np.fromiter(
+        (uniques.setdefault(row.get(column), len(uniques)) for row in rows),
+        dtype=np.intp,
+        count=len(rows)
+    )
+    return codes, list(uniques)
+
+
+def _column_points(rows: list, column: str, points_for):
+    codes, uniques = _factorize(rows, column)
+    np = _numpy()
+    return np.array([points_for(value) for value in uniques], dtype=np.int32)[codes]
+
+
+def score_rows(rows: list, job_titles: list = None, rules: dict = None):
+    """
+    Quality scores for a batch of lead rows as an int array, computed
+    column-wise: e-mail status weight, phone/website/domain presence and
+    whether the position contains one of the campaign's job titles as
+    whole words (case-insensitive).
+    """
+    np = _numpy()
+    rules = rules or resolve_rules()
+    if not rows:
+        return np.zeros(0, dtype=np.int32)
+
+    status_points = rules["email_status"]
+    scores = _column_points(
+        rows, "email_status", lambda value: status_points.get((value or "").strip().lower(), 0)
+    )
+
+    for column, rule in (("phone", "has_phone"), ("website", "has_website"), ("domain", "has_domain")):
+        points = rules[rule]
+        scores += _column_points(rows, column, lambda value: points if value and value.strip() else 0)
+
+    titles = [_words(title) for title in (job_titles or []) if title and title.strip()]
+    if titles:
+        points = rules["position_match"]
+        scores += _column_points(
+            rows, "position", lambda value: points if any(title in _words(value) for title in titles) else 0
+        )
+
+    return np.minimum(scores, rules["max_score"])
+
+
+def apply_quality_scores(rows: list, job_titles: list = None, rules: dict = None):
+    """Set `quality_score` on every row in place."""
+    for row, score in zip(rows, score_rows(rows, job_titles, rules).tolist()):
+        row["quality_score"] = score
+    return rows
+
+
+def get_campaign_job_titles(campaign_id: str):
+    cached = campaign_titles_cache.get(campaign_id)
+    if cached is not None:
+        return cached
+
+    result = supabase.table("campaigns") \
+        .select("job_titles") \
+        .eq("id", campaign_id) \
+        .execute()
+    titles = (result.data[0].get("job_titles") if result.data else None) or []
+    campaign_titles_cache.set(campaign_id, titles)
+    return titles
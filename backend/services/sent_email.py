@@ -1,7 +1,12 @@
 import os
+import queue
 import smtplib
+import ssl
+import threading
+from concurrent.futures import Future
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,8 +15,20 @@ SENDER = "astelpauly2002@gmail.com"
 GMAIL_PASSWORD = os.getenv("gmail_password")
 TRACKING_BASE_URL = "https://email-tracking-0au6.onrender.com/track"
 
+# SMTP settings - override to point at a local test server (e.g. aiosmtpd on port 1025, SMTP_USE_SSL=false)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() == "true"
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_MAX_RETRIES = 2
 
-def send_email(lead_id: str, user_id: str, campaign_id: str, receiver_email: str):
+
+# Errors that mean the connection is unusable and should be replaced
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def build_message(lead_id: str, user_id: str, campaign_id: str, receiver_email: str):
     tracking_url = f"{TRACKING_BASE_URL}?u={user_id}&c={campaign_id}&l={lead_id}"
 
     msg = MIMEMultipart("alternative")
@@ -32,9 +49,231 @@ def send_email(lead_id: str, user_id: str, campaign_id: str, receiver_email: str
 """
 
     msg.attach(MIMEText(html_content, "html"))
+    return msg
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` open SMTP connections and hands them out one caller
+    at a time. Each connection is upgraded with STARTTLS when offered and
+    logs in only when a password is set and the server offers AUTH.
+    Broken connections are closed and replaced on demand.
+    """
+
+    def __init__(self, host: str, port: int, use_ssl: bool, username: Optional[str],
+                 password: Optional[str], size: int = SMTP_POOL_SIZE, timeout: float = SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                      context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            encrypted = self.use_ssl
+            if not encrypted and server.has_extn("starttls"):
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+                encrypted = True
+
+            # Servers without AUTH (e.g. a local aiosmtpd) take mail unauthenticated
+            if self.password and server.has_extn("auth"):
+                if not encrypted:
+                    raise smtplib.SMTPException(
+                        f"{self.host}:{self.port} offers neither SSL nor STARTTLS; refusing to send credentials"
+                    )
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # Pool is full - wait for a connection to come back, then re-check
+            # in case it was released as broken and a new slot opened up
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def release(self, server, broken: bool = False):
+        if not broken:
+            self._idle.put(server)
+            return
+        try:
+            server.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def close(self):
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                server.quit()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
+
+class SMTPSender:
+    """
+    Sends messages from a queue on `workers` threads that share one
+    connection pool, so a batch pays for the TLS handshake and login once
+    per connection instead of once per message.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, workers: int = SMTP_POOL_SIZE,
+                 max_retries: int = SMTP_MAX_RETRIES):
+        self.pool = pool
+        self.workers = workers
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._threads = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"smtp-sender-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._started = True
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            args, future = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._send(*args))
+                except Exception as e:
+                    future.set_exception(e)
+            self._queue.task_done()
+
+    def _send(self, lead_id: str, user_id: str, campaign_id: str, receiver_email: str):
+        msg = build_message(lead_id, user_id, campaign_id, receiver_email).as_string()
+
+        for attempt in range(self.max_retries + 1):
+            server = self.pool.acquire()
+            try:
+                server.sendmail(SENDER, receiver_email, msg)
+            except _CONNECTION_ERRORS:
+                # Server dropped the connection - replace it and try again
+                self.pool.release(server, broken=True)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            except Exception:
+                self.pool.release(server)
+                raise
+            self.pool.release(server)
+            print(f"Email sent to {receiver_email} (lead_id={lead_id})")
+            return lead_id
+
+    def submit(self, lead_id: str, user_id: str, campaign_id: str, receiver_email: str) -> Future:
+        self._start()
+        future = Future()
+        self._queue.put(((lead_id, user_id, campaign_id, receiver_email), future))
+        return future
+
+    def send_batch(self, user_id: str, items: List[Tuple[str, str, str]]):
+        """
+        Send one email per (lead_id, campaign_id, receiver_email) tuple and wait
+        for all of them. Returns the sent lead ids and the failures with errors.
+        """
+        futures = [
+            (lead_id, receiver_email, self.submit(lead_id, user_id, campaign_id, receiver_email))
+            for lead_id, campaign_id, receiver_email in items
+        ]
+
+        sent, failed = [], []
+        for lead_id, receiver_email, future in futures:
+            try:
+                future.result()
+                sent.append(lead_id)
+            except Exception as e:
+                failed.append({"lead_id": lead_id, "email": receiver_email, "error": str(e)})
+
+        return {"sent": sent, "failed": failed}
+
+    def close(self):
+        with self._lock:
+            if not self._started:
+                return
+            for _ in self._threads:
+                self._queue.put(None)
+            threads, self._threads = self._threads, []
+            self._started = False
+        for thread in threads:
+            thread.join()
+        self.pool.close()
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender() -> SMTPSender:
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            pool = SMTPConnectionPool(SMTP_HOST, SMTP_PORT, SMTP_USE_SSL, SENDER, GMAIL_PASSWORD)
+            _sender = SMTPSender(pool)
+        return _sender
+
+
+def close_sender():
+    global _sender
+    with _sender_lock:
+        sender, _sender = _sender, None
+    if sender is not None:
+        sender.close()
+
+
+def send_email(lead_id: str, user_id: str, campaign_id: str, receiver_email: str):
+    get_sender().submit(lead_id, user_id, campaign_id, receiver_email).result()
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(SENDER, GMAIL_PASSWORD)
-        server.sendmail(SENDER, receiver_email, msg.as_string())
 
-    print(f"Email sent to {receiver_email} (lead_id={lead_id})")
+def send_emails_batch(user_id: str, items: List[Tuple[str, str, str]]):
+    return get_sender().send_batch(user_id, items)
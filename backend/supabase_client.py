@@ -1,6 +1,6 @@
 import os
+import threading
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 load_dotenv()  # loads .env file
 
@@ -17,11 +17,43 @@ def _clean_env(name: str):
 SUPABASE_URL = _clean_env("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = _clean_env("SUPABASE_SERVICE_KEY")
 
+# Optional - used to verify access tokens locally (see utils/auth_helpers.py)
+SUPABASE_JWT_SECRET = _clean_env("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_PUBLIC_KEY = _clean_env("SUPABASE_JWT_PUBLIC_KEY")
+
 if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
     raise Exception("Supabase env variables not set")
 
-# Create Supabase client
-supabase: Client = create_client(
-    SUPABASE_URL,
-    SUPABASE_SERVICE_KEY
-)
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_supabase():
+    """Create the shared Supabase client on first use, once per worker process."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Importing supabase pulls in auth, storage and realtime; keep it off the import path
+                import httpx
+                from supabase import ClientOptions, create_client
+                from utils.resilience import ResilientTransport, default_timeout, supabase_breaker, supabase_retries
+
+                # PostgREST, auth and storage calls all share this client: per-call
+                # timeouts, read retries and the Supabase circuit breaker
+                http_client = httpx.Client(
+                    transport=ResilientTransport(supabase_breaker, supabase_retries),
+                    timeout=default_timeout()
+                )
+                _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, ClientOptions(httpx_client=http_client))
+    return _client
+
+
+class _LazySupabase:
+    """Stands in for the client so `from supabase_client import supabase` stays cheap to import."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+
+supabase = _LazySupabase()
@@ -1,5 +1,103 @@
+import os
+from types import SimpleNamespace
 from fastapi import Header, HTTPException
-from supabase_client import supabase
+from supabase_client import supabase, SUPABASE_JWT_SECRET, SUPABASE_JWT_PUBLIC_KEY
+from utils.cache import TTLCache
+
+# "remote" asks Supabase to validate every token; "local" verifies the JWT
+# signature in-process with SUPABASE_JWT_SECRET (HS256) or SUPABASE_JWT_PUBLIC_KEY
+AUTH_MODE = os.getenv("AUTH_MODE", "remote").lower()
+JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+
+# Only approved users are cached, so a newly approved user is picked up on
+# the next request even in a worker that did not handle the approval.
+approval_cache = TTLCache(
+    maxsize=int(os.getenv("APPROVAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("APPROVAL_CACHE_TTL", "300"))
+)
+
+
+def invalidate_approval(user_id: str):
+    approval_cache.delete(user_id)
+
+
+def _get_user_remote(token: str):
+    # supabase-python client exposes auth on the client. Older examples used
+    # `supabase.auth.api.get_user(token)` but newer versions provide
+    # `supabase.auth.get_user(token)` — handle possible return shapes.
+    user_response = None
+    if hasattr(supabase.auth, 'get_user'):
+        user_response = supabase.auth.get_user(token)
+    elif hasattr(supabase.auth, 'api') and hasattr(supabase.auth.api, 'get_user'):
+        user_response = supabase.auth.api.get_user(token)
+    else:
+        raise Exception('Supabase auth client does not support get_user')
+
+    # user_response may be an object with .user, or a dict with keys 'user' or 'data'
+    user = None
+    if hasattr(user_response, 'user') and user_response.user:
+        user = user_response.user
+    elif isinstance(user_response, dict):
+        user = user_response.get('user') or (user_response.get('data') and user_response['data'].get('user'))
+
+    return user
+
+
+def _get_user_local(token: str):
+    # PyJWT (and its crypto backend) is only needed in AUTH_MODE=local
+    import jwt
+
+    if SUPABASE_JWT_PUBLIC_KEY:
+        key, algorithms = SUPABASE_JWT_PUBLIC_KEY, ["RS256", "ES256"]
+    elif SUPABASE_JWT_SECRET:
+        key, algorithms = SUPABASE_JWT_SECRET, ["HS256"]
+    else:
+        raise Exception("AUTH_MODE=local requires SUPABASE_JWT_SECRET or SUPABASE_JWT_PUBLIC_KEY")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=algorithms,
+        audience=JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]}
+    )
+
+    # Mirror the attributes routes read from the supabase User object
+    return SimpleNamespace(
+        id=claims["sub"],
+        email=claims.get("email"),
+        role=claims.get("role"),
+        app_metadata=claims.get("app_metadata", {}),
+        user_metadata=claims.get("user_metadata", {})
+    )
+
+
+def _check_approved(user_id: str):
+    if approval_cache.get(user_id):
+        return
+
+    try:
+        profile_response = supabase.table("profiles")\
+            .select("is_approved")\
+            .eq("id", user_id)\
+            .single()\
+            .execute()
+
+        profile = profile_response.data
+    except Exception as e:
+        # If profile check fails, deny access for security
+        raise HTTPException(
+            status_code=403,
+            detail=f"Unable to verify account approval status: {str(e)}"
+        )
+
+    if not profile or not profile.get("is_approved", False):
+        raise HTTPException(
+            status_code=403,
+            detail="Account not approved. Please contact the administrator."
+        )
+
+    approval_cache.set(user_id, True)
 
 
 def get_current_user(authorization: str = Header(...)):
@@ -7,51 +105,17 @@ def get_current_user(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail="Invalid token format")
     token = authorization.split(" ")[1]
 
-    # supabase-python client exposes auth on the client. Older examples used
-    # `supabase.auth.api.get_user(token)` but newer versions provide
-    # `supabase.auth.get_user(token)` — handle possible return shapes.
     try:
-        user_response = None
-        if hasattr(supabase.auth, 'get_user'):
-            user_response = supabase.auth.get_user(token)
-        elif hasattr(supabase.auth, 'api') and hasattr(supabase.auth.api, 'get_user'):
-            user_response = supabase.auth.api.get_user(token)
+        if AUTH_MODE == "local":
+            user = _get_user_local(token)
         else:
-            raise Exception('Supabase auth client does not support get_user')
-
-        # user_response may be an object with .user, or a dict with keys 'user' or 'data'
-        user = None
-        if hasattr(user_response, 'user') and user_response.user:
-            user = user_response.user
-        elif isinstance(user_response, dict):
-            user = user_response.get('user') or (user_response.get('data') and user_response['data'].get('user'))
+            user = _get_user_remote(token)
 
         if not user:
             raise HTTPException(status_code=401, detail="Invalid token")
 
         # Check if user is approved
-        try:
-            profile_response = supabase.table("profiles")\
-                .select("is_approved")\
-                .eq("id", user.id)\
-                .single()\
-                .execute()
-
-            profile = profile_response.data
-
-            if not profile or not profile.get("is_approved", False):
-                raise HTTPException(
-                    status_code=403,
-                    detail="Account not approved. Please contact the administrator."
-                )
-        except HTTPException:
-            raise
-        except Exception as e:
-            # If profile check fails, deny access for security
-            raise HTTPException(
-                status_code=403,
-                detail=f"Unable to verify account approval status: {str(e)}"
-            )
+        _check_approved(user.id)
 
         return user
     except HTTPException:
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from supabase_client import supabase
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 1000
+
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _insert_chunk(table: str, start: int, rows: list, upsert: bool = False):
+    try:
+        if upsert:
+            supabase.table(table).upsert(rows).execute()
+        else:
+            supabase.table(table).insert(rows).execute()
+        return start, rows, None
+    except Exception as e:
+        return start, rows, str(e)
+
+
+def insert_in_chunks(table: str, rows: list, chunk_size: int = DEFAULT_CHUNK_SIZE, concurrency: int = 1,
+                     on_chunk=None, upsert: bool = False):
+    """
+    Insert rows as multi-row inserts of at most `chunk_size` rows.
+    Chunks run on up to `concurrency` threads. A failing chunk does not
+    stop the others; it is reported with its row offset and error.
+    `on_chunk(row_count)` is called after each chunk finishes. With
+    `upsert=True` rows are merged onto existing ones by primary key.
+    """
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    chunks = list(chunked(rows, chunk_size))
+
+    def run(chunk):
+        result = _insert_chunk(table, *chunk, upsert=upsert)
+        if on_chunk:
+            on_chunk(len(chunk[1]))
+        return result
+
+    if concurrency > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as pool:
+            results = list(pool.map(run, chunks))
+    else:
+        results = [run(chunk) for chunk in chunks]
+
+    inserted_rows = []
+    failed_chunks = []
+    for start, chunk, error in results:
+        if error is None:
+            inserted_rows.extend(chunk)
+        else:
+            failed_chunks.append({
+                "offset": start,
+                "size": len(chunk),
+                "error": error
+            })
+
+    return inserted_rows, failed_chunks
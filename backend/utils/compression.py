@@ -0,0 +1,127 @@
+import asyncio
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/csv", "text/html", "application/x-ndjson")
+# Bodies above this are compressed off the event loop
+THREAD_MIN_SIZE = 128 * 1024
+
+
+def _accepted_encodings(header: str):
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str):
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int):
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware that compresses complete (non-streaming) text and
+    JSON responses of at least `minimum_size` bytes with brotli or gzip,
+    whichever the client accepts (brotli only when the package is installed).
+    Streaming responses (file downloads, SSE, NDJSON) pass through untouched.
+    Strong ETags are weakened on compressed responses, as the bytes differ.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            # First body message decides whether this response is compressed
+            passthrough = True
+            body = message.get("body", b"")
+            headers = {k.lower(): v for k, v in start_message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in headers
+                or content_type not in COMPRESSIBLE_TYPES
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_MIN_SIZE:
+                body = await asyncio.to_thread(
+                    compress, body, encoding, self.gzip_level, self.brotli_quality
+                )
+            else:
+                body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+
+            new_headers = []
+            for key, value in start_message.get("headers", []):
+                name = key.lower()
+                if name == b"content-length":
+                    continue
+                if name == b"etag" and not value.startswith(b"W/"):
+                    value = b"W/" + value
+                new_headers.append((key, value))
+            new_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding")
+            ]
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,48 @@
+import hashlib
+from fastapi import Request, Response
+from utils.response_cache import get_cached, set_cached
+from utils.json_response import dumps
+
+JSON_MEDIA_TYPE = "application/json"
+# Let clients keep the body but revalidate it on every poll
+CACHE_CONTROL = "private, no-cache"
+
+
+def render_json(payload):
+    """Serialize the payload and return (body, strong ETag)."""
+    body = dumps(payload)
+    return body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_response(request: Request, body: bytes, etag: str):
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+async def conditional_json(request: Request, route: str, user_id: str, load):
+    """
+    Answer a per-user read with an ETag, or 304 when If-None-Match matches.
+    The rendered body and its ETag sit in the response cache next to the
+    payload, so an unchanged poll skips both the query and serialization;
+    invalidate_user() drops them with the rest of the user's entries.
+    `load` is an async callable returning the payload on a miss.
+    """
+    rendered_key = f"{route}:rendered"
+    rendered = get_cached(rendered_key, user_id)
+    if rendered is None:
+        rendered = render_json(await load())
+        set_cached(rendered_key, user_id, rendered)
+    return etag_response(request, *rendered)
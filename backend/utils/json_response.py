@@ -0,0 +1,24 @@
+import json
+import os
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+# "orjson" (default, when installed) or "stdlib"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+USE_ORJSON = orjson is not None and JSON_BACKEND == "orjson"
+
+
+def dumps(payload) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, with orjson when available."""
+    if USE_ORJSON:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
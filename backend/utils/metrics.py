@@ -0,0 +1,210 @@
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+# Latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Opt-in request body logging for debugging
+DEBUG_LOG_BODIES = os.getenv("DEBUG_LOG_BODIES", "false").lower() == "true"
+DEBUG_BODY_SAMPLE_RATE = float(os.getenv("DEBUG_BODY_SAMPLE_RATE", "0.01"))
+DEBUG_BODY_MAX_BYTES = int(os.getenv("DEBUG_BODY_MAX_BYTES", "2048"))
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "count", "latency_sum", "request_bytes", "response_bytes", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._gauges = {}
+        self._counters = {}
+
+    def set_gauge(self, name: str, value: float):
+        """Process-level gauge, e.g. startup timings."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def inc_counter(self, name: str, amount: int = 1):
+        """Process-level monotonically increasing counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def start(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, method: str, route: str, status: int, latency: float,
+               request_bytes: int, response_bytes: int):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.count += 1
+            stats.latency_sum += latency
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            in_flight = self.in_flight
+            lines = [
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {in_flight}",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), stats in routes:
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, bucket in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += bucket
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines.append("# TYPE http_request_size_bytes_total counter")
+            for (method, route), stats in routes:
+                lines.append(f'http_request_size_bytes_total{{method="{method}",route="{route}"}} {stats.request_bytes}')
+
+            lines.append("# TYPE http_response_size_bytes_total counter")
+            for (method, route), stats in routes:
+                lines.append(f'http_response_size_bytes_total{{method="{method}",route="{route}"}} {stats.response_bytes}')
+
+            for name, value in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value:.6f}")
+
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _mount_prefix(route, path: str, path_params: dict):
+    """
+    The part of `path` in front of the route's own template, i.e. the
+    include_router prefix: the shortest prefix whose remainder the route
+    matches with the same path params the router extracted.
+    """
+    regex = getattr(route, "path_regex", None)
+    if regex is None:
+        return ""
+    for start in range(len(path)):
+        if path[start] != "/":
+            continue
+        match = regex.match(path[start:])
+        if match is None:
+            continue
+        convertors = getattr(route, "param_convertors", {})
+        params = {
+            name: convertors[name].convert(value) if name in convertors else value
+            for name, value in match.groupdict().items()
+        }
+        if params == path_params:
+            return path[:start]
+    return ""
+
+
+def route_template(scope):
+    """
+    The matched route template with its router prefix (e.g.
+    /dashboard/dashboard/{user_id}), so label cardinality stays bounded by
+    the number of routes. Requests that matched no route (404 scans) share
+    one label.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    return _mount_prefix(route, scope["path"], scope.get("path_params") or {}) + template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records latency, status, request/response sizes
+    and in-flight requests per route template. Bodies are counted as they
+    stream through and are never buffered. With DEBUG_LOG_BODIES=true a
+    sample of POST bodies is logged, truncated to DEBUG_BODY_MAX_BYTES.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        request_bytes = 0
+        response_bytes = 0
+        status = 500
+        capture = (
+            DEBUG_LOG_BODIES
+            and method == "POST"
+            and random.random() < DEBUG_BODY_SAMPLE_RATE
+        )
+        captured = bytearray()
+
+        async def receive_wrapper():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                request_bytes += len(body)
+                if capture and len(captured) < DEBUG_BODY_MAX_BYTES:
+                    captured.extend(body[:DEBUG_BODY_MAX_BYTES - len(captured)])
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        self.registry.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            latency = time.perf_counter() - start
+            self.registry.finish(method, route_template(scope), status, latency, request_bytes, response_bytes)
+
+            if capture:
+                truncated = " (truncated)" if request_bytes > len(captured) else ""
+                print(f"\n>>> POST {scope['path']} -> {status}")
+                print(f">>> BODY{truncated}: {captured.decode('utf-8', errors='replace')}")
+            if status == 422:
+                print(f">>> 422 on {scope['path']}")
@@ -0,0 +1,68 @@
+import base64
+import json
+from fastapi import HTTPException
+from supabase_client import supabase
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SCAN_PAGE_SIZE = 1000
+
+
+def encode_cursor(created_at: str, row_id: str):
+    raw = json.dumps([created_at, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def keyset_page(query, cursor: str, limit: int, id_column: str = "id"):
+    """
+    Apply (created_at, id) keyset pagination, newest first, to an async
+    postgrest query and return (rows, next_cursor). One extra row is fetched to tell
+    whether another page exists.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",{id_column}.lt."{row_id}")'
+        )
+
+    result = await (
+        query
+        .order("created_at", desc=True)
+        .order(id_column, desc=True)
+        .limit(limit + 1)
+        .execute()
+    )
+
+    rows = result.data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last[id_column])
+
+    return rows, next_cursor
+
+
+def iter_user_rows(table: str, columns: str, user_id: str, page_size: int = SCAN_PAGE_SIZE, eq: dict = None):
+    """Read every row of a user's table in id order, one page at a time, optionally filtered by `eq`."""
+    last_id = None
+    while True:
+        query = supabase.table(table).select(f"id, {columns}").eq("user_id", user_id)
+        for column, value in (eq or {}).items():
+            query = query.eq(column, value)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
@@ -0,0 +1,275 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import httpx
+
+# Per-call timeouts for every Supabase request (seconds)
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3"))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "10"))
+
+# Idempotent reads are retried on connection errors and gateway statuses,
+# with exponential backoff and full jitter; writes are never retried
+SUPABASE_RETRY_ATTEMPTS = int(os.getenv("SUPABASE_RETRY_ATTEMPTS", "3"))
+SUPABASE_RETRY_BASE_DELAY = float(os.getenv("SUPABASE_RETRY_BASE_DELAY", "0.1"))
+SUPABASE_RETRY_MAX_DELAY = float(os.getenv("SUPABASE_RETRY_MAX_DELAY", "1"))
+
+# The breaker opens after this many consecutive failed calls (a read counts
+# once, after its retries are used up) and lets one trial
+# request through once SUPABASE_BREAKER_RESET seconds have passed
+SUPABASE_BREAKER_FAILURES = int(os.getenv("SUPABASE_BREAKER_FAILURES", "5"))
+SUPABASE_BREAKER_RESET = float(os.getenv("SUPABASE_BREAKER_RESET", "30"))
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+# Failures that happen before the upstream did any work. A read timeout is
+# not retried: repeating a slow query only piles more load on the upstream.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+
+
+def default_timeout():
+    return httpx.Timeout(SUPABASE_HTTP_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+
+
+def is_timeout(exc: BaseException):
+    """True when exc, or an exception it was raised from, is a timeout."""
+    while exc is not None:
+        if isinstance(exc, (httpx.TimeoutException, TimeoutError)):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def upstream_error_status(exc: BaseException):
+    """
+    HTTP status for an upstream failure: 503 for a fail-fast breaker
+    rejection, 504 for a timeout, 502 for any other connection error and
+    None when the upstream answered (e.g. bad credentials).
+    """
+    if isinstance(exc, CircuitOpenError):
+        return 503
+    if is_timeout(exc):
+        return 504
+    if isinstance(exc, httpx.TransportError):
+        return 502
+    return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker shared by the sync and async clients of one
+    upstream. While open, calls fail fast with CircuitOpenError; after
+    reset_timeout a single trial call decides whether it closes again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = SUPABASE_BREAKER_FAILURES,
+                 reset_timeout: float = SUPABASE_BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started = None
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    def before_call(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self._state == OPEN and waited >= self.reset_timeout:
+                self._state = HALF_OPEN
+            # A trial that never reported back (e.g. cancelled) is replaced after reset_timeout
+            now = time.monotonic()
+            if self._state == HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_timeout
+            ):
+                self._trial_started = now
+                return
+            self.rejected_total += 1
+            raise CircuitOpenError(self.name, max(self.reset_timeout - waited, 0))
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened_total += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_started = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened_total": self.opened_total,
+                "rejected_total": self.rejected_total
+            }
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff, plus counters."""
+
+    def __init__(self, attempts: int = SUPABASE_RETRY_ATTEMPTS, base_delay: float = SUPABASE_RETRY_BASE_DELAY,
+                 max_delay: float = SUPABASE_RETRY_MAX_DELAY):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self.retries_total = 0
+        self.timeouts_total = 0
+        self.errors_total = 0
+
+    def attempts_for(self, request: httpx.Request):
+        return self.attempts if request.method in IDEMPOTENT_METHODS else 1
+
+    def delay(self, attempt: int):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def count(self, retried: bool = False, exc: BaseException = None):
+        with self._lock:
+            if retried:
+                self.retries_total += 1
+            if exc is not None:
+                if is_timeout(exc):
+                    self.timeouts_total += 1
+                else:
+                    self.errors_total += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "retries_total": self.retries_total,
+                "timeouts_total": self.timeouts_total,
+                "transport_errors_total": self.errors_total
+            }
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """httpx transport for the sync supabase client: breaker, then retries for idempotent reads."""
+
+    def __init__(self, breaker: CircuitBreaker, policy: RetryPolicy, transport: httpx.BaseTransport = None):
+        self.breaker = breaker
+        self.policy = policy
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        # One breaker admission and one success/failure per call, however many attempts it takes
+        self.breaker.before_call()
+        attempts = self.policy.attempts_for(request)
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                retry = not last and isinstance(e, RETRYABLE_ERRORS)
+                self.policy.count(retried=retry, exc=e)
+                if not retry:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(self.policy.delay(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUSES:
+                self.breaker.record_success()
+                return response
+            if last:
+                self.breaker.record_failure()
+                return response
+            self.policy.count(retried=True)
+            response.close()
+            time.sleep(self.policy.delay(attempt))
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of ResilientTransport for the shared AsyncClient."""
+
+    def __init__(self, breaker: CircuitBreaker, policy: RetryPolicy, transport: httpx.AsyncBaseTransport = None):
+        self.breaker = breaker
+        self.policy = policy
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.breaker.before_call()
+        attempts = self.policy.attempts_for(request)
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                retry = not last and isinstance(e, RETRYABLE_ERRORS)
+                self.policy.count(retried=retry, exc=e)
+                if not retry:
+                    self.breaker.record_failure()
+                    raise
+                await asyncio.sleep(self.policy.delay(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUSES:
+                self.breaker.record_success()
+                return response
+            if last:
+                self.breaker.record_failure()
+                return response
+            self.policy.count(retried=True)
+            await response.aclose()
+            await asyncio.sleep(self.policy.delay(attempt))
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# One breaker and retry policy per upstream, shared by every client in the worker
+supabase_breaker = CircuitBreaker("supabase")
+supabase_retries = RetryPolicy()
+
+
+def resilience_stats():
+    return {"supabase": {**supabase_breaker.stats(), **supabase_retries.stats()}}
+
+
+def render_prometheus():
+    """Breaker state and retry counters in the Prometheus text format."""
+    lines = ["# TYPE upstream_circuit_open gauge"]
+    stats = resilience_stats()
+    for name, s in stats.items():
+        lines.append(f'upstream_circuit_open{{upstream="{name}"}} {int(s["state"] != CLOSED)}')
+    for metric in ("opened_total", "rejected_total", "retries_total", "timeouts_total", "transport_errors_total"):
+        lines.append(f"# TYPE upstream_{metric} counter")
+        for name, s in stats.items():
+            lines.append(f'upstream_{metric}{{upstream="{name}"}} {s[metric]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,22 @@
+import os
+from utils.cache import TTLCache
+
+# Per-user cache for read endpoints, keyed by (user_id, route)
+response_cache = TTLCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+)
+
+
+def get_cached(route: str, user_id: str):
+    return response_cache.get((user_id, route))
+
+
+def set_cached(route: str, user_id: str, value):
+    response_cache.set((user_id, route), value)
+
+
+def invalidate_user(user_id: str):
+    """Drop every cached read for a user. Called by write endpoints after they commit."""
+    if user_id:
+        response_cache.delete_where(lambda key: key[0] == user_id)
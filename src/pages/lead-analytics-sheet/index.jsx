@@ -41,7 +41,7 @@ const LeadAnalyticsSheet = () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await apiGet(`/lead-analytics/${user.user_id}`);
+      const data = await apiGet(`/lead-analytics/${user.user_id}?all=true`);
       setLeads(
         (data.lead_list || []).map((lead, idx) => ({
           ...lead,
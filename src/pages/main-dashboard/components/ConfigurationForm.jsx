@@ -41,7 +41,7 @@ const ConfigurationForm = ({ onSubmit, dashboardData = {} }) => {
   // but keep the form visible until the user clicks a toggle
   useEffect(() => {
     if (!user?.user_id) return;
-    apiGet(`/leads/${user.user_id}`)
+    apiGet(`/leads/${user.user_id}?all=true`)
       .then(data => {
         const pending = data?.pending_leads || [];
         const approved = data?.approved_leads || [];